@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+# Score analytics across every resume analyzed so far, answered from
+# running totals instead of a scan over stored results.
+#
+# Each role's results go to an append-only file of fixed-size records (one
+# file per keyword list, so a role whose keywords change starts a new
+# segment). Files are read as numpy record arrays, and every process folds
+# records it has not seen yet (its own and other workers') into per-segment
+# aggregates: a 0-100 score histogram, score sums, and found counts per
+# keyword, section and contact field. A summary then costs the same for
+# ten results as for a million.
+
+SCORE_FIELDS = (
+    'overall_score', 'keyword_score', 'skill_score',
+    'experience_score', 'format_score', 'section_score'
+)
+SEGMENT_FILE = re.compile(r'(.+)\.([0-9a-f]{12})\.bin$')
+
+
+def _mask(flags, names):
+    return sum(1 << bit for bit, name in enumerate(names) if flags.get(name))
+
+
+def _bit_counts(values, width):
+    if not len(values):
+        return np.zeros(width, dtype=np.int64)
+    return ((values.astype(np.int64)[:, None] >> np.arange(width)) & 1).sum(axis=0)
+
+
+def _top_terms(rows, top):
+    # rows are (keyword, count, results it could have appeared in)
+    rows = sorted((row for row in rows if row[1]), key=lambda row: (-row[1], row[0]))
+    return [{'keyword': keyword, 'count': count, 'rate': round(count / seen, 4)} for keyword, count, seen in rows[:top]]
+
+
+class _Segment:
+    def __init__(self, path, job_role, keywords, sections, contact):
+        self.path = path
+        self.job_role = job_role
+        self.keywords = keywords
+        self.sections = sections
+        self.contact = contact
+        self.dtype = np.dtype(
+            [('digest', 'S32'), ('analyzed_at', '<f8')]
+            + [(field, 'u1') for field in SCORE_FIELDS]
+            + [('sections', '<u4'), ('contact', 'u1'), ('keywords', 'u1', (max(1, (len(keywords) + 7) // 8),))]
+        )
+        self.records = np.zeros(0, dtype=self.dtype)
+        self.count = 0
+        self.histogram = np.zeros(101, dtype=np.int64)
+        self.score_sums = np.zeros(len(SCORE_FIELDS), dtype=np.int64)
+        self.keyword_found = np.zeros(len(keywords), dtype=np.int64)
+        self.section_found = np.zeros(len(sections), dtype=np.int64)
+        self.contact_found = np.zeros(len(contact), dtype=np.int64)
+
+    def read_new(self):
+        # Maps the file again if it grew; returns the index of the first new record
+        start = len(self.records)
+        count = os.path.getsize(self.path) // self.dtype.itemsize
+        if count > start:
+            self.records = np.memmap(self.path, dtype=self.dtype, mode='r', shape=(count,))
+        return start
+
+    def apply(self, records, sign):
+        if not len(records):
+            return
+        self.count += sign * len(records)
+        self.histogram += sign * np.bincount(records['overall_score'], minlength=101)[:101]
+        self.score_sums += sign * np.array([records[field].sum(dtype=np.int64) for field in SCORE_FIELDS])
+        self.keyword_found += sign * np.unpackbits(
+            records['keywords'], axis=1, count=len(self.keywords), bitorder='little'
+        ).sum(axis=0, dtype=np.int64)
+        self.section_found += sign * _bit_counts(records['sections'], len(self.sections))
+        self.contact_found += sign * _bit_counts(records['contact'], len(self.contact))
+
+
+class ScoreAnalytics:
+    def __init__(self, directory, sections, contact):
+        # sections and contact are the flag names kept per result, in the
+        # order of their bits
+        self.directory = directory
+        self.sections = tuple(sections)
+        self.contact = tuple(contact)
+        self._segments = {}
+        self._latest = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_for(self, role):
+        keywords_hash = hashlib.sha256(json.dumps(role.keywords).encode('utf-8')).hexdigest()[:12]
+        path = os.path.join(self.directory, f'{role.key}.{keywords_hash}.bin')
+        segment = self._segments.get(path)
+        if segment is None:
+            meta_path = path[:-4] + '.json'
+            if not os.path.exists(meta_path):
+                with open(meta_path + f'.{os.getpid()}', 'w') as f:
+                    json.dump({
+                        'job_role': role.key,
+                        'keywords': list(role.keywords),
+                        'sections': list(self.sections),
+                        'contact': list(self.contact)
+                    }, f)
+                os.replace(meta_path + f'.{os.getpid()}', meta_path)
+            open(path, 'ab').close()
+            segment = self._open_segment(path)
+        return segment
+
+    def _open_segment(self, path):
+        with open(path[:-4] + '.json') as f:
+            meta = json.load(f)
+        segment = _Segment(path, meta['job_role'], meta['keywords'], meta['sections'], meta['contact'])
+        self._segments[path] = segment
+        return segment
+
+    def record(self, digest, role, scores, sections, contact, found_terms):
+        # One analysis of the resume with this SHA-256 against role; a later
+        # record for the same resume and role replaces it in the totals.
+        with self._lock:
+            segment = self._segment_for(role)
+            record = np.zeros(1, dtype=segment.dtype)
+            record['digest'] = bytes.fromhex(digest)
+            record['analyzed_at'] = time.time()
+            for field in SCORE_FIELDS:
+                record[field] = min(max(int(scores[field]), 0), 100)
+            record['sections'] = _mask(sections, segment.sections)
+            record['contact'] = _mask(contact, segment.contact)
+            record['keywords'] = np.packbits(
+                np.array([term in found_terms for term in role.keyword_terms], dtype=np.uint8),
+                bitorder='little'
+            ) if role.keyword_terms else 0
+            # a single O_APPEND write, so workers sharing the directory do
+            # not interleave records
+            with open(segment.path, 'ab') as f:
+                f.write(record.tobytes())
+
+    def _refresh(self):
+        for filename in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, filename)
+            if SEGMENT_FILE.match(filename) and path not in self._segments:
+                try:
+                    self._open_segment(path)
+                except (OSError, ValueError):
+                    continue
+        for segment in self._segments.values():
+            start = segment.read_new()
+            self._fold(segment, start)
+
+    def _fold(self, segment, start):
+        records = segment.records[start:]
+        if not len(records):
+            return
+        keep = np.ones(len(records), dtype=bool)
+        for i, (digest, analyzed_at) in enumerate(zip(records['digest'].tolist(), records['analyzed_at'].tolist())):
+            key = (segment.job_role, digest)
+            previous = self._latest.get(key)
+            if previous is not None:
+                old_segment, old_index = previous
+                if old_segment.records[old_index]['analyzed_at'] > analyzed_at:
+                    keep[i] = False
+                    continue
+                if old_segment is segment and old_index >= start:
+                    keep[old_index - start] = False
+                else:
+                    old_segment.apply(old_segment.records[old_index:old_index + 1], -1)
+            self._latest[key] = (segment, start + i)
+        segment.apply(records[keep], 1)
+
+    def roles(self):
+        with self._lock:
+            self._refresh()
+            return sorted({segment.job_role for segment in self._segments.values() if segment.count})
+
+    def summary(self, job_role, bins=10, top=10):
+        # None when nothing was recorded for job_role
+        with self._lock:
+            self._refresh()
+            segments = [
+                segment for segment in self._segments.values()
+                if segment.job_role == job_role and segment.count
+            ]
+            if not segments:
+                return None
+            count = sum(segment.count for segment in segments)
+            histogram = sum(segment.histogram for segment in segments)
+            score_sums = sum(segment.score_sums for segment in segments)
+            keywords = {}
+            for segment in segments:
+                for keyword, found in zip(segment.keywords, segment.keyword_found.tolist()):
+                    totals = keywords.setdefault(keyword, [0, 0])
+                    totals[0] += found
+                    totals[1] += segment.count
+            sections = {}
+            contact = {}
+            for segment in segments:
+                for name, found in zip(segment.sections, segment.section_found.tolist()):
+                    sections[name] = sections.get(name, 0) + found
+                for name, found in zip(segment.contact, segment.contact_found.tolist()):
+                    contact[name] = contact.get(name, 0) + found
+
+        cumulative = np.cumsum(histogram)
+        edges = np.minimum(np.arange(101) * bins // 100, bins - 1)
+        bin_counts = np.bincount(edges, weights=histogram, minlength=bins).astype(np.int64).tolist()
+
+        return {
+            'job_role': job_role,
+            'count': count,
+            'score': {
+                'mean': round(float(score_sums[0]) / count, 2),
+                'percentiles': {
+                    str(p): int(np.searchsorted(cumulative, count * p / 100.0))
+                    for p in (10, 25, 50, 75, 90)
+                },
+                # a bucket runs from the smallest score that maps to it
+                # (ceil(number * 100 / bins)) to the one before the next
+                # bucket's; the last one also takes 100
+                'histogram': [
+                    {
+                        'from': -(-number * 100 // bins),
+                        'to': -(-(number + 1) * 100 // bins) - 1 if number < bins - 1 else 100,
+                        'count': bin_count
+                    }
+                    for number, bin_count in enumerate(bin_counts)
+                ]
+            },
+            'mean_scores': {field: round(float(total) / count, 2) for field, total in zip(SCORE_FIELDS, score_sums)},
+            'missing_keywords': _top_terms(
+                [(keyword, seen - found, seen) for keyword, (found, seen) in keywords.items()], top
+            ),
+            'found_keywords': _top_terms(
+                [(keyword, found, seen) for keyword, (found, seen) in keywords.items()], top
+            ),
+            'sections': {name: round(found / count, 4) for name, found in sections.items()},
+            'contact_info': {name: round(found / count, 4) for name, found in contact.items()}
+        }
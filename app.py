@@ -1,763 +1,1727 @@
-import PyPDF2
-import re
-from flask import Flask, request, jsonify
-import os
-
-app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-
-if not os.path.exists('uploads'):
-    os.makedirs('uploads')
-
-JOB_ROLES = {
-    'data-scientist': {
-        'name': 'Data Scientist',
-        'keywords': [
-            'python', 'r', 'sql', 'machine learning', 'statistics', 'data analysis',
-            'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 
-            'data visualization', 'tableau', 'power bi', 'jupyter', 'hypothesis testing',
-            'a/b testing', 'regression', 'classification', 'clustering', 
-            'feature engineering', 'model evaluation', 'cross-validation'
-        ],
-        'skills': [
-            'Statistical Analysis', 'Machine Learning', 'Data Visualization',
-            'Python/R Programming', 'SQL', 'Big Data Technologies', 
-            'Communication Skills', 'Problem Solving'
-        ],
-        'experience': [
-            'built predictive models', 'analyzed large datasets', 'created dashboards',
-            'presented insights', 'data-driven decisions', 'improved accuracy'
-        ]
-    },
-    'ml-engineer': {
-        'name': 'Machine Learning Engineer',
-        'keywords': [
-            'python', 'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'mlops',
-            'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'ci/cd', 'model deployment',
-            'rest api', 'flask', 'fastapi', 'spark', 'airflow', 'model monitoring',
-            'feature store', 'mlflow', 'kubeflow', 'model optimization'
-        ],
-        'skills': [
-            'ML Model Development', 'MLOps', 'Cloud Platforms', 'Model Deployment',
-            'API Development', 'Distributed Computing', 'Version Control'
-        ],
-        'experience': [
-            'deployed ml models', 'built scalable pipelines', 'optimized performance',
-            'automated training', 'production environment', 'reduced latency'
-        ]
-    },
-    'deep-learning': {
-        'name': 'Deep Learning Engineer',
-        'keywords': [
-            'deep learning', 'neural networks', 'cnn', 'rnn', 'lstm', 'transformer',
-            'attention mechanism', 'pytorch', 'tensorflow', 'keras', 'computer vision',
-            'nlp', 'gpu', 'cuda', 'model architecture', 'backpropagation',
-            'gradient descent', 'batch normalization', 'dropout', 'transfer learning'
-        ],
-        'skills': [
-            'Deep Neural Networks', 'Computer Vision', 'NLP', 'PyTorch/TensorFlow',
-            'GPU Computing', 'Model Architecture Design', 'Research Skills'
-        ],
-        'experience': [
-            'designed neural networks', 'trained deep learning models',
-            'implemented research papers', 'improved accuracy', 'reduced training time'
-        ]
-    },
-    'generative-ai': {
-        'name': 'Generative AI Engineer',
-        'keywords': [
-            'generative ai', 'llm', 'gpt', 'bert', 'transformer', 'diffusion models',
-            'gan', 'vae', 'stable diffusion', 'openai', 'anthropic', 'langchain',
-            'llamaindex', 'prompt engineering', 'fine-tuning', 'rag',
-            'retrieval augmented generation', 'embedding', 'vector database'
-        ],
-        'skills': [
-            'Large Language Models', 'Prompt Engineering', 'RAG Systems',
-            'Vector Databases', 'API Integration', 'Fine-tuning'
-        ],
-        'experience': [
-            'built llm applications', 'implemented rag systems', 'fine-tuned models',
-            'optimized prompts', 'integrated apis', 'improved response quality'
-        ]
-    },
-    'agentic-ai': {
-        'name': 'Agentic AI Engineer',
-        'keywords': [
-            'agentic ai', 'autonomous agents', 'multi-agent systems', 'langchain',
-            'autogen', 'agent frameworks', 'tool use', 'function calling', 'planning',
-            'reasoning', 'memory systems', 'agent orchestration', 'llm agents'
-        ],
-        'skills': [
-            'Agent Architecture', 'LLM Integration', 'Tool Development',
-            'Planning Algorithms', 'Multi-agent Coordination', 'System Design'
-        ],
-        'experience': [
-            'developed autonomous agents', 'built multi-agent systems',
-            'implemented tool-use', 'designed agent architectures'
-        ]
-    },
-    'ai-researcher': {
-        'name': 'AI Researcher',
-        'keywords': [
-            'research', 'publications', 'arxiv', 'conference', 'nips', 'icml', 'iclr',
-            'cvpr', 'acl', 'emnlp', 'novel algorithms', 'theoretical', 'mathematical',
-            'pytorch', 'tensorflow', 'experiments', 'ablation studies'
-        ],
-        'skills': [
-            'Research Methodology', 'Technical Writing', 'Experimentation',
-            'Mathematical Foundations', 'Algorithm Development', 'Publication Record'
-        ],
-        'experience': [
-            'published research papers', 'conducted experiments', 'developed algorithms',
-            'presented at conferences', 'reviewed papers'
-        ]
-    }
-}
-
-def extract_text_from_pdf(file_path):
-    try:
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
-    except Exception as e:
-        print(f"Error extracting text: {e}")
-        return ""
-
-def analyze_resume(text, job_role):
-    role_data = JOB_ROLES[job_role]
-    text_lower = text.lower()
-    
-    found_keywords = [kw for kw in role_data['keywords'] if kw.lower() in text_lower]
-    keyword_score = (len(found_keywords) / len(role_data['keywords'])) * 100
-    
-    found_skills = [skill for skill in role_data['skills'] if skill.lower() in text_lower]
-    skill_score = (len(found_skills) / len(role_data['skills'])) * 100
-    
-    found_experience = [exp for exp in role_data['experience'] if exp.lower() in text_lower]
-    experience_score = (len(found_experience) / len(role_data['experience'])) * 100
-    
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    
-    has_email = bool(re.search(email_pattern, text))
-    has_phone = bool(re.search(phone_pattern, text))
-    has_linkedin = 'linkedin.com' in text_lower
-    has_github = 'github.com' in text_lower
-    
-    format_score = sum([has_email, has_phone, has_linkedin, has_github]) * 25
-    
-    sections = {
-        'summary': bool(re.search(r'(summary|objective|profile)', text_lower)),
-        'experience': bool(re.search(r'(experience|employment|work history)', text_lower)),
-        'education': bool(re.search(r'(education|academic|degree|university|college)', text_lower)),
-        'skills': bool(re.search(r'(skills|technical skills|competencies)', text_lower)),
-        'projects': bool(re.search(r'(projects|portfolio)', text_lower))
-    }
-    section_score = (sum(sections.values()) / len(sections)) * 100
-    
-    overall_score = (
-        keyword_score * 0.35 +
-        skill_score * 0.25 +
-        experience_score * 0.20 +
-        format_score * 0.10 +
-        section_score * 0.10
-    )
-    
-    recommendations = generate_recommendations(
-        overall_score, sections, 
-        {'has_email': has_email, 'has_phone': has_phone, 
-         'has_linkedin': has_linkedin, 'has_github': has_github},
-        len(found_keywords), len(role_data['keywords'])
-    )
-    
-    return {
-        'overall_score': round(overall_score),
-        'keyword_score': round(keyword_score),
-        'skill_score': round(skill_score),
-        'experience_score': round(experience_score),
-        'format_score': round(format_score),
-        'section_score': round(section_score),
-        'found_keywords': found_keywords[:20],
-        'missing_keywords': [kw for kw in role_data['keywords'] if kw not in found_keywords][:20],
-        'found_skills': found_skills,
-        'missing_skills': [skill for skill in role_data['skills'] if skill not in found_skills],
-        'sections': sections,
-        'contact_info': {
-            'email': has_email,
-            'phone': has_phone,
-            'linkedin': has_linkedin,
-            'github': has_github
-        },
-        'recommendations': recommendations
-    }
-
-def generate_recommendations(score, sections, contact, found_kw, total_kw):
-    recs = []
-    
-    if score < 60:
-        recs.append('Your ATS score is low. Focus on incorporating more relevant keywords and skills.')
-    elif score < 80:
-        recs.append('Good start! Add more role-specific keywords to improve your score.')
-    else:
-        recs.append('Excellent ATS score! Your resume is well-optimized.')
-    
-    if not sections['summary']:
-        recs.append('Add a professional summary highlighting your key qualifications.')
-    if not sections['experience']:
-        recs.append('Include a clear experience section with quantifiable achievements.')
-    if not sections['skills']:
-        recs.append('Add a dedicated technical skills section with relevant technologies.')
-    if not sections['projects']:
-        recs.append('Include projects showcasing your practical experience.')
-    
-    if not contact['has_email']:
-        recs.append('Add your email address for contact purposes.')
-    if not contact['has_linkedin']:
-        recs.append('Include your LinkedIn profile URL.')
-    if not contact['has_github']:
-        recs.append('Add your GitHub profile to showcase your code portfolio.')
-    
-    return recs
-
-@app.route('/')
-def index():
-    return HTML_TEMPLATE
-
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    try:
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No file uploaded'}), 400
-        
-        file = request.files['resume']
-        job_role = request.form.get('job_role', 'data-scientist')
-        
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not file.filename.endswith('.pdf'):
-            return jsonify({'error': 'Please upload a PDF file'}), 400
-        
-        filename = 'resume.pdf'
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        text = extract_text_from_pdf(filepath)
-        
-        if not text:
-            return jsonify({'error': 'Could not extract text from PDF'}), 400
-        
-        result = analyze_resume(text, job_role)
-        result['role_name'] = JOB_ROLES[job_role]['name']
-        
-        os.remove(filepath)
-        
-        return jsonify(result)
-    
-    except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({'error': str(e)}), 500
-
-HTML_TEMPLATE = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI/ML Resume ATS Analyzer</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .header {
-            text-align: center;
-            color: white;
-            margin-bottom: 40px;
-        }
-        .header h1 {
-            font-size: 2.5rem;
-            margin-bottom: 10px;
-        }
-        .card {
-            background: white;
-            border-radius: 16px;
-            padding: 30px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.1);
-        }
-        .form-group {
-            margin-bottom: 25px;
-        }
-        .form-group label {
-            display: block;
-            font-weight: 600;
-            margin-bottom: 10px;
-            color: #333;
-        }
-        .form-group select {
-            width: 100%;
-            padding: 12px 15px;
-            border: 2px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 1rem;
-        }
-        .upload-area {
-            border: 3px dashed #d0d0d0;
-            border-radius: 12px;
-            padding: 50px 20px;
-            text-align: center;
-            cursor: pointer;
-            margin-bottom: 25px;
-        }
-        .upload-area:hover {
-            border-color: #667eea;
-            background: #f8f9ff;
-        }
-        .btn-primary {
-            width: 100%;
-            padding: 15px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            border-radius: 8px;
-            font-size: 1.1rem;
-            font-weight: 600;
-            cursor: pointer;
-        }
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
-        }
-        .loading {
-            text-align: center;
-            padding: 40px;
-            display: none;
-        }
-        .spinner {
-            width: 50px;
-            height: 50px;
-            border: 4px solid #f3f3f3;
-            border-top: 4px solid #667eea;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 20px;
-        }
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        #results {
-            display: none;
-        }
-        .score-card {
-            text-align: center;
-        }
-        .score-circle {
-            width: 180px;
-            height: 180px;
-            border-radius: 50%;
-            display: inline-flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            margin: 20px auto;
-        }
-        .score-circle.high {
-            background: linear-gradient(135deg, #d4fc79 0%, #96e6a1 100%);
-        }
-        .score-circle.medium {
-            background: linear-gradient(135deg, #ffeaa7 0%, #fdcb6e 100%);
-        }
-        .score-circle.low {
-            background: linear-gradient(135deg, #ff7675 0%, #fd79a8 100%);
-        }
-        .score-value {
-            font-size: 3.5rem;
-            font-weight: 700;
-        }
-        .score-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin: 30px 0;
-        }
-        .score-item {
-            background: #f8f9fa;
-            padding: 25px;
-            border-radius: 12px;
-        }
-        .score-value-large {
-            font-size: 2.5rem;
-            font-weight: 700;
-            margin: 10px 0;
-        }
-        .score-value-large.high { color: #27ae60; }
-        .score-value-large.medium { color: #f39c12; }
-        .score-value-large.low { color: #e74c3c; }
-        .progress-bar {
-            width: 100%;
-            height: 8px;
-            background: #e0e0e0;
-            border-radius: 4px;
-            overflow: hidden;
-        }
-        .progress-fill {
-            height: 100%;
-            transition: width 1s ease;
-        }
-        .progress-fill.high { background: #27ae60; }
-        .progress-fill.medium { background: #f39c12; }
-        .progress-fill.low { background: #e74c3c; }
-        .tag-container {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            margin: 15px 0;
-        }
-        .tag {
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 0.9rem;
-        }
-        .tag.found {
-            background: #d4fc79;
-            color: #27ae60;
-        }
-        .tag.missing {
-            background: #ffcccb;
-            color: #e74c3c;
-        }
-        .section-title {
-            font-size: 1.4rem;
-            margin-bottom: 20px;
-            color: #333;
-        }
-        .checklist-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-        }
-        .checklist-item {
-            padding: 12px;
-            background: #f8f9fa;
-            border-radius: 8px;
-            font-weight: 500;
-        }
-        .checklist-item.present {
-            background: #d4fc79;
-            color: #27ae60;
-        }
-        .checklist-item.absent {
-            background: #ffcccb;
-            color: #e74c3c;
-        }
-        .recommendations-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
-        .recommendations-list {
-            list-style: none;
-        }
-        .recommendations-list li {
-            padding: 15px;
-            margin: 10px 0;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 8px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>AI/ML Resume ATS Analyzer</h1>
-            <p>Optimize your resume for Data Science, ML, AI, and Generative AI roles</p>
-        </div>
-
-        <div class="card">
-            <form id="upload-form" enctype="multipart/form-data">
-                <div class="form-group">
-                    <label for="job-role">Select Job Role</label>
-                    <select id="job-role" name="job_role" required>
-                        <option value="data-scientist">Data Scientist</option>
-                        <option value="ml-engineer">Machine Learning Engineer</option>
-                        <option value="deep-learning">Deep Learning Engineer</option>
-                        <option value="generative-ai">Generative AI Engineer</option>
-                        <option value="agentic-ai">Agentic AI Engineer</option>
-                        <option value="ai-researcher">AI Researcher</option>
-                    </select>
-                </div>
-
-                <div class="upload-area" id="upload-area">
-                    <input type="file" id="resume-file" name="resume" accept=".pdf" required style="display:none;">
-                    <p style="font-size: 1.2rem; font-weight: 600; margin-bottom: 5px;">Upload Your Resume (PDF)</p>
-                    <p style="color: #666;">Click to browse or drag and drop</p>
-                    <p id="file-name" style="color: #667eea; font-weight: 600; margin-top: 10px;"></p>
-                </div>
-
-                <button type="submit" class="btn-primary">Analyze Resume</button>
-            </form>
-
-            <div class="loading" id="loading">
-                <div class="spinner"></div>
-                <p>Analyzing your resume...</p>
-            </div>
-        </div>
-
-        <div id="results">
-            <div class="card score-card">
-                <h2>ATS Score</h2>
-                <div class="score-circle" id="score-circle">
-                    <div class="score-value" id="overall-score">0</div>
-                    <div>out of 100</div>
-                </div>
-                <div id="score-status"></div>
-            </div>
-
-            <div class="score-grid">
-                <div class="score-item">
-                    <div>Keyword Match</div>
-                    <div class="score-value-large" id="keyword-score">0%</div>
-                    <div class="progress-bar"><div class="progress-fill" id="keyword-progress"></div></div>
-                </div>
-                <div class="score-item">
-                    <div>Skills Match</div>
-                    <div class="score-value-large" id="skill-score">0%</div>
-                    <div class="progress-bar"><div class="progress-fill" id="skill-progress"></div></div>
-                </div>
-                <div class="score-item">
-                    <div>Experience</div>
-                    <div class="score-value-large" id="experience-score">0%</div>
-                    <div class="progress-bar"><div class="progress-fill" id="experience-progress"></div></div>
-                </div>
-                <div class="score-item">
-                    <div>Format & Structure</div>
-                    <div class="score-value-large" id="format-score">0%</div>
-                    <div class="progress-bar"><div class="progress-fill" id="format-progress"></div></div>
-                </div>
-            </div>
-
-            <div class="card">
-                <h3 class="section-title">Keyword Analysis</h3>
-                <h4 style="color: #27ae60; margin: 10px 0;">Found Keywords <span id="found-kw-count"></span></h4>
-                <div class="tag-container" id="found-keywords"></div>
-                <h4 style="color: #e74c3c; margin: 10px 0;">Missing Keywords <span id="missing-kw-count"></span></h4>
-                <div class="tag-container" id="missing-keywords"></div>
-            </div>
-
-            <div class="card">
-                <h3 class="section-title">Skills Assessment</h3>
-                <h4 style="color: #27ae60; margin: 10px 0;">Found Skills</h4>
-                <div class="tag-container" id="found-skills"></div>
-                <h4 style="color: #e74c3c; margin: 10px 0;">Missing Skills</h4>
-                <div class="tag-container" id="missing-skills"></div>
-            </div>
-
-            <div class="card">
-                <h3 class="section-title">Resume Sections</h3>
-                <div class="checklist-grid" id="sections-checklist"></div>
-            </div>
-
-            <div class="card">
-                <h3 class="section-title">Contact Information</h3>
-                <div class="checklist-grid" id="contact-checklist"></div>
-            </div>
-
-            <div class="card recommendations-card">
-                <h3 class="section-title">Recommendations</h3>
-                <ul class="recommendations-list" id="recommendations"></ul>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        const uploadArea = document.getElementById('upload-area');
-        const fileInput = document.getElementById('resume-file');
-        const fileName = document.getElementById('file-name');
-        const uploadForm = document.getElementById('upload-form');
-        const loading = document.getElementById('loading');
-        const results = document.getElementById('results');
-
-        uploadArea.addEventListener('click', () => fileInput.click());
-
-        fileInput.addEventListener('change', () => {
-            if (fileInput.files.length > 0) {
-                fileName.textContent = fileInput.files[0].name;
-            }
-        });
-
-        uploadArea.addEventListener('dragover', (e) => {
-            e.preventDefault();
-            uploadArea.style.borderColor = '#667eea';
-        });
-
-        uploadArea.addEventListener('dragleave', () => {
-            uploadArea.style.borderColor = '#d0d0d0';
-        });
-
-        uploadArea.addEventListener('drop', (e) => {
-            e.preventDefault();
-            uploadArea.style.borderColor = '#d0d0d0';
-            if (e.dataTransfer.files.length > 0) {
-                fileInput.files = e.dataTransfer.files;
-                fileName.textContent = fileInput.files[0].name;
-            }
-        });
-
-        uploadForm.addEventListener('submit', async (e) => {
-            e.preventDefault();
-            
-            const formData = new FormData(uploadForm);
-            uploadForm.style.display = 'none';
-            loading.style.display = 'block';
-            results.style.display = 'none';
-            
-            try {
-                const response = await fetch('/analyze', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const data = await response.json();
-                
-                if (response.ok) {
-                    displayResults(data);
-                    setTimeout(() => results.scrollIntoView({ behavior: 'smooth' }), 300);
-                } else {
-                    alert('Error: ' + (data.error || 'Failed to analyze'));
-                    uploadForm.style.display = 'block';
-                }
-            } catch (error) {
-                alert('Error: ' + error.message);
-                uploadForm.style.display = 'block';
-            } finally {
-                loading.style.display = 'none';
-            }
-        });
-
-        function displayResults(data) {
-            const score = data.overall_score;
-            document.getElementById('overall-score').textContent = score;
-            
-            const scoreCircle = document.getElementById('score-circle');
-            const scoreStatus = document.getElementById('score-status');
-            
-            let statusText, statusClass;
-            if (score >= 80) {
-                statusText = '✓ Excellent! ATS Optimized';
-                statusClass = 'high';
-            } else if (score >= 60) {
-                statusText = '⚠ Good, needs improvement';
-                statusClass = 'medium';
-            } else {
-                statusText = '✗ Needs optimization';
-                statusClass = 'low';
-            }
-            
-            scoreCircle.className = 'score-circle ' + statusClass;
-            scoreStatus.textContent = statusText;
-            scoreStatus.style.padding = '12px 24px';
-            scoreStatus.style.borderRadius = '25px';
-            scoreStatus.style.fontWeight = '600';
-            scoreStatus.style.marginTop = '20px';
-            scoreStatus.style.display = 'inline-block';
-            
-            if (statusClass === 'high') {
-                scoreStatus.style.background = '#d4fc79';
-                scoreStatus.style.color = '#27ae60';
-            } else if (statusClass === 'medium') {
-                scoreStatus.style.background = '#ffeaa7';
-                scoreStatus.style.color = '#e17055';
-            } else {
-                scoreStatus.style.background = '#ff7675';
-                scoreStatus.style.color = '#d63031';
-            }
-            
-            updateScore('keyword', data.keyword_score);
-            updateScore('skill', data.skill_score);
-            updateScore('experience', data.experience_score);
-            updateScore('format', data.format_score);
-            
-            displayTags('found-keywords', data.found_keywords, 'found');
-            displayTags('missing-keywords', data.missing_keywords, 'missing');
-            document.getElementById('found-kw-count').textContent = '(' + data.found_keywords.length + ')';
-            document.getElementById('missing-kw-count').textContent = '(' + data.missing_keywords.length + ')';
-            
-            displayTags('found-skills', data.found_skills, 'found');
-            displayTags('missing-skills', data.missing_skills, 'missing');
-            
-            displayChecklist('sections-checklist', data.sections);
-            displayChecklist('contact-checklist', {
-                'Email': data.contact_info.email,
-                'Phone': data.contact_info.phone,
-                'LinkedIn': data.contact_info.linkedin,
-                'GitHub': data.contact_info.github
-            });
-            
-            const recList = document.getElementById('recommendations');
-            recList.innerHTML = '';
-            data.recommendations.forEach(rec => {
-                const li = document.createElement('li');
-                li.textContent = rec;
-                recList.appendChild(li);
-            });
-            
-            results.style.display = 'block';
-            uploadForm.style.display = 'block';
-        }
-
-        function updateScore(type, score) {
-            document.getElementById(type + '-score').textContent = score + '%';
-            const elem = document.getElementById(type + '-score');
-            const progress = document.getElementById(type + '-progress');
-            
-            const className = score >= 80 ? 'high' : score >= 60 ? 'medium' : 'low';
-            elem.className = 'score-value-large ' + className;
-            progress.className = 'progress-fill ' + className;
-            setTimeout(() => progress.style.width = score + '%', 100);
-        }
-
-        function displayTags(id, items, type) {
-            const container = document.getElementById(id);
-            container.innerHTML = '';
-            items.forEach(item => {
-                const tag = document.createElement('span');
-                tag.className = 'tag ' + type;
-                tag.textContent = item;
-                container.appendChild(tag);
-            });
-        }
-
-        function displayChecklist(id, items) {
-            const container = document.getElementById(id);
-            container.innerHTML = '';
-            for (const [key, value] of Object.entries(items)) {
-                const item = document.createElement('div');
-                item.className = 'checklist-item ' + (value ? 'present' : 'absent');
-                const icon = value ? '✓' : '✗';
-                const label = key.charAt(0).toUpperCase() + key.slice(1);
-                item.textContent = icon + ' ' + label;
-                container.appendChild(item);
-            }
-        }
-    </script>
-</body>
-</html>'''
-
-if __name__ == '__main__':
-    print("Starting ATS Analyzer on http://localhost:5000")
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from flask import Flask, Request, Response, g, request, jsonify, render_template, stream_with_context, url_for
+from assets import Asset, load_asset
+from cache import LRUCache
+from encoding import FORMATS, MSGPACK_MIMETYPE, compact_rows, msgpack, pack, parse_fields, project
+from extractors import DOCUMENT_BACKENDS, DOCUMENT_TYPES, PDF_BACKENDS, Document, document_type, pdf_backend
+from jobs import JobQueue
+from metrics import Counter, Histogram, Registry, gauge_lines
+from roles import RoleRegistry, RoleSet, RoleSetCache, adhoc_role_id, definition_from_description
+from store import CandidateStore
+from uploads import UploadStore
+
+class SpooledRequest(Request):
+    # Uploads stay in memory and only spill to an anonymous temp file once
+    # they grow past UPLOAD_SPOOL_MAX_SIZE.
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(
+            max_size=app.config['UPLOAD_SPOOL_MAX_SIZE'],
+            mode='rb+',
+            dir=app.config['UPLOAD_SPOOL_DIR']
+        )
+
+# Static files go through static_asset() below instead of Flask's handler.
+app = Flask(__name__, static_folder=None)
+app.request_class = SpooledRequest
+app.config['STATIC_DIR'] = os.path.join(app.root_path, 'static')
+app.config['ASSET_MAX_AGE'] = 365 * 24 * 60 * 60
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+app.config['UPLOAD_SPOOL_MAX_SIZE'] = 2 * 1024 * 1024
+app.config['UPLOAD_SPOOL_DIR'] = None
+app.config['EXTRACT_MAX_PAGES'] = 50
+app.config['EXTRACT_MAX_CHARS'] = 200000
+app.config['EXTRACT_SLOW_PAGE_SECONDS'] = 0.5
+app.config['EXTRACT_PARALLEL_MIN_PAGES'] = None
+app.config['EXTRACT_PDF_BACKEND'] = 'auto'
+app.config['PDF_MAX_PAGES'] = 200
+app.config['PDF_TRIAGE_SAMPLE_PAGES'] = 3
+app.config['BATCH_MAX_FILES'] = 500
+app.config['BATCH_MAX_UNCOMPRESSED_SIZE'] = 256 * 1024 * 1024
+app.config['BATCH_WORKERS'] = os.cpu_count() or 1
+app.config['TEXT_CACHE_MAX_BYTES'] = 64 * 1024 * 1024
+app.config['RESULT_CACHE_MAX_BYTES'] = 16 * 1024 * 1024
+app.config['CACHE_PATH'] = None
+app.config['DEDUP_MODE'] = 'reuse'
+app.config['DEDUP_THRESHOLD'] = 0.9
+app.config['DEDUP_MAX_ENTRIES'] = 100000
+app.config['CANDIDATE_DB_PATH'] = 'candidates.db'
+app.config['SEARCH_MAX_RESULTS'] = 100
+app.config['ANALYTICS_DIR'] = 'analytics'
+app.config['ASGI_WORKERS'] = 4
+app.config['ASGI_MAX_QUEUE'] = 32
+app.config['ASGI_REQUEST_TIMEOUT'] = 30
+app.config['SERVER_HOST'] = '0.0.0.0'
+app.config['SERVER_PORT'] = 8000
+app.config['SERVER_WORKERS'] = None
+app.config['SERVER_MAX_REQUESTS'] = 1000
+app.config['SERVER_MAX_REQUESTS_JITTER'] = 100
+app.config['JOBS_DB_PATH'] = 'jobs.db'
+app.config['JOBS_DIR'] = 'jobs'
+app.config['JOB_WORKERS'] = 2
+app.config['JOB_RUN_WORKERS'] = True
+app.config['JOB_POLL_SECONDS'] = 0.5
+app.config['JOB_RETENTION_SECONDS'] = 24 * 60 * 60
+app.config['JOB_MAX_ATTEMPTS'] = 3
+app.config['JOB_EVENTS_MAX_SECONDS'] = 5
+app.config['UPLOADS_DIR'] = 'uploads'
+app.config['UPLOAD_MAX_SIZE'] = 512 * 1024 * 1024
+app.config['UPLOAD_CHUNK_MAX_SIZE'] = 8 * 1024 * 1024
+app.config['UPLOAD_RETENTION_SECONDS'] = 24 * 60 * 60
+app.config['ROLES_DIR'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'roles')
+app.config['ROLES_POLL_SECONDS'] = 2.0
+app.config['JD_CACHE_MAX_BYTES'] = 8 * 1024 * 1024
+app.config['JD_MAX_CHARS'] = 50000
+app.config['JD_MAX_EXTRA_TERMS'] = 15
+app.config['ADHOC_ROLES_COMPILED'] = 256
+
+METRICS = Registry()
+REQUEST_SECONDS = METRICS.register(Histogram(
+    'ats_request_seconds', 'Time to produce a response, by endpoint.', ['endpoint']
+))
+STAGE_SECONDS = METRICS.register(Histogram(
+    'ats_stage_seconds', 'Time spent in each stage of resume analysis.', ['stage']
+))
+PAGE_SECONDS = METRICS.register(Histogram(
+    'ats_pdf_page_seconds', 'Time to extract the text of one PDF page.'
+))
+PDF_PAGES = METRICS.register(Histogram(
+    'ats_pdf_pages', 'Pages extracted per PDF.', buckets=(1, 2, 3, 5, 10, 20, 50, 100)
+))
+UPLOAD_BYTES = METRICS.register(Histogram(
+    'ats_upload_bytes', 'Size of uploaded resumes in bytes.',
+    buckets=tuple(2 ** n * 1024 for n in range(4, 15, 2))
+))
+REQUESTS = METRICS.register(Counter(
+    'ats_requests_total', 'Requests by endpoint, job role and status.', ['endpoint', 'job_role', 'status']
+))
+ERRORS = METRICS.register(Counter(
+    'ats_errors_total', 'Failed requests by endpoint and job role.', ['endpoint', 'job_role']
+))
+DUPLICATES = METRICS.register(Counter(
+    'ats_duplicates_total', 'Uploads matched to an earlier near-identical resume.', ['reused']
+))
+PDF_REJECTIONS = METRICS.register(Counter(
+    'ats_pdf_rejections_total', 'PDFs rejected before scoring, by reason.', ['reason']
+))
+
+# Reasons a PDF is rejected, from triage_pdf plus 'no_text' when extraction
+# comes back empty; reported to clients as 'code'
+PDF_REJECTION_ERRORS = {
+    'unreadable': ('File is not a readable PDF', 400),
+    'encrypted': ('PDF is password protected', 400),
+    'too_many_pages': ('PDF has too many pages', 413),
+    'image_only': ('PDF contains only scanned images; upload a text-based PDF', 400),
+    'no_text': ('Could not extract text from PDF', 400),
+    'unreadable_document': ('File is not a readable DOCX or text file', 400)
+}
+
+UPLOAD_ERRORS = {
+    'not_found': ('Unknown upload', 404),
+    'busy': ('Another chunk of this upload is still being received', 409),
+    'offset_mismatch': ('Chunk does not start where the upload currently ends', 409),
+    'incomplete': ('Upload has not reached its declared size', 409),
+    'too_large': ('Upload is larger than its declared size or the upload size limit', 413),
+    'chunk_too_large': ('Chunk is larger than the chunk size limit', 413)
+}
+
+ADHOC_ROLES = RoleSetCache(app.config['ADHOC_ROLES_COMPILED'])
+
+_role_registry = None
+
+def get_roles():
+    # Current RoleSet snapshot; take it once per request and pass it along.
+    # The role files are loaded and compiled on first use (or in warm_up).
+    global _role_registry
+    if _role_registry is None:
+        _role_registry = RoleRegistry(app.config['ROLES_DIR'], app.config['ROLES_POLL_SECONDS'])
+    return _role_registry.get()
+
+def resolve_roles(job_role):
+    # The snapshot that defines job_role: the role files, or for an ad-hoc
+    # 'jd-' id the RoleSet compiled from its job description. Definitions
+    # live in the 'jd' cache; compiled sets are rebuilt from there on demand.
+    roles = get_roles()
+    if job_role == '*' or job_role in roles or not job_role.startswith('jd-'):
+        return roles
+    role_set = ADHOC_ROLES.get(job_role)
+    if role_set is None:
+        definition = get_caches()['jd'].get(job_role)
+        if definition is None:
+            return roles
+        role_set = RoleSet({job_role: definition})
+        ADHOC_ROLES.put(job_role, role_set)
+    return role_set
+
+def rank_texts(texts, job_role, method='bm25', roles=None):
+    # Alternative to analyze_resume for a pool of candidates: BM25 or TF-IDF
+    # weighted role scores, where rare terms count for more than common ones.
+    if roles is None:
+        roles = get_roles()
+    term_counts = []
+    doc_lengths = []
+    for text in texts:
+        text_lower = text.lower()
+        term_counts.append(roles.matcher.count(text_lower))
+        doc_lengths.append(len(text_lower.split()))
+    return roles.ranker.rank(term_counts, doc_lengths, job_role, method)
+
+def get_pdf_backend():
+    # EXTRACT_PDF_BACKEND is 'auto' for the fastest one installed, or a
+    # name from extractors.PDF_BACKENDS
+    return pdf_backend(app.config['EXTRACT_PDF_BACKEND'])
+
+def open_pdf(source):
+    # A Document for a path, a binary stream or a PdfReader from triage_pdf.
+    # triage's PyPDF2 reader is reused when PyPDF2 is the backend, and is
+    # the fallback when the configured backend cannot open the file.
+    from PyPDF2 import PdfReader
+    reader = source if isinstance(source, PdfReader) else None
+    if reader is not None:
+        source = reader.stream
+    backend = get_pdf_backend()
+    if backend.name != 'pypdf2':
+        try:
+            if isinstance(source, str):
+                return Document(backend, backend.open_file(source), source)
+            return Document(backend, backend.open(source), source)
+        except Exception as e:
+            print(f"PDF backend {backend.name} failed, using PyPDF2: {e}")
+    fallback = PDF_BACKENDS['pypdf2']
+    if reader is None:
+        reader = fallback.open(source)
+    return Document(fallback, reader, source)
+
+def iter_pdf_pages(source, max_pages=None, max_chars=None, timings=None, parallel=False):
+    # Yields page texts lazily so callers can stop as soon as they have seen
+    # enough. Extraction stops after max_pages pages or max_chars characters,
+    # and each page's extraction time is appended to timings if given.
+    # source is normally the Document from triage_upload (any file type);
+    # anything else is opened as a PDF. With parallel=True, long PDFs are
+    # split across the extraction pool (see extract_pages_parallel) instead
+    # of being read page by page.
+    if max_pages is None:
+        max_pages = app.config['EXTRACT_MAX_PAGES']
+    if max_chars is None:
+        max_chars = app.config['EXTRACT_MAX_CHARS']
+    
+    document = source if isinstance(source, Document) else open_pdf(source)
+    page_count = min(document.page_count, max_pages)
+    if parallel and document.backend.name in PDF_BACKENDS and use_parallel_extraction(page_count):
+        extracted = extract_pages_parallel(document, page_count, max_chars)
+    else:
+        extracted = _extract_pages(document, page_count, 0, max_chars)
+    remaining = max_chars
+    pages = 0
+    try:
+        for number, (page_text, elapsed) in enumerate(extracted):
+            if remaining <= 0:
+                break
+            pages += 1
+            PAGE_SECONDS.observe(elapsed)
+            if timings is not None:
+                timings.append(elapsed)
+            if elapsed > app.config['EXTRACT_SLOW_PAGE_SECONDS']:
+                print(f"Slow PDF page {number + 1}: {elapsed:.2f}s")
+            
+            page_text = page_text[:remaining]
+            remaining -= len(page_text)
+            yield page_text
+    finally:
+        PDF_PAGES.observe(pages)
+
+def _extract_pages(document, page_count, start=0, max_chars=None):
+    # (page text, seconds) for pages start..page_count, one at a time
+    pages = document.pages(start, page_count)
+    for _ in range(start, page_count):
+        if max_chars is not None and max_chars <= 0:
+            break
+        started = time.perf_counter()
+        page_text = next(pages)
+        yield page_text, time.perf_counter() - started
+        if max_chars is not None:
+            max_chars -= len(page_text)
+
+def use_parallel_extraction(page_count):
+    # EXTRACT_PARALLEL_MIN_PAGES unset keeps every document on the serial
+    # path, as do documents shorter than it and pool workers themselves.
+    min_pages = app.config['EXTRACT_PARALLEL_MIN_PAGES']
+    return (
+        bool(min_pages) and page_count >= min_pages
+        and app.config['BATCH_WORKERS'] > 1 and not _in_extraction_worker
+    )
+
+def shared_pdf_path(source):
+    # Returns (path, is temporary copy) for a file holding the PDF, so pool
+    # workers can map it rather than receive the bytes pickled. Files that
+    # are already on disk (job and chunked-upload spools) are used in place.
+    name = source if isinstance(source, str) else getattr(source, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, False
+    source.seek(0)
+    with NamedTemporaryFile('wb', suffix='.pdf', dir=app.config['UPLOAD_SPOOL_DIR'], delete=False) as f:
+        shutil.copyfileobj(source, f, 1024 * 1024)
+    return f.name, True
+
+def _extract_page_range(path, backend_name, start, stop, max_chars):
+    # Runs in an extraction pool process. Backends map the file (or, for
+    # PDFium, read it natively), so every worker reads the same page-cache
+    # pages instead of its own copy.
+    backend = PDF_BACKENDS[backend_name]
+    document = Document(backend, backend.open_file(path), path)
+    return list(_extract_pages(document, stop, start, max_chars))
+
+def extract_pages_parallel(document, page_count, max_chars):
+    # Splits the first page_count pages into one contiguous range per pool
+    # worker; returns (page text, seconds) for every page, in page order.
+    path, temporary = shared_pdf_path(document.source)
+    try:
+        workers = app.config['BATCH_WORKERS']
+        bounds = [page_count * number // workers for number in range(workers + 1)]
+        
+        def extract(pool):
+            futures = [
+                pool.submit(_extract_page_range, path, document.backend.name, start, stop, max_chars)
+                for start, stop in zip(bounds, bounds[1:]) if stop > start
+            ]
+            return [page for future in futures for page in future.result()]
+        return with_extraction_pool(extract)
+    finally:
+        if temporary:
+            os.unlink(path)
+
+def extract_text_from_pdf(source, max_pages=None, max_chars=None, timings=None):
+    # source is a Document from triage_upload (PDF, DOCX or text), or a
+    # path, a readable, seekable binary stream or a PdfReader holding a PDF
+    try:
+        with STAGE_SECONDS.time(stage='extract'):
+            return '\n'.join(iter_pdf_pages(source, max_pages, max_chars, timings, parallel=True))
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+        return ""
+
+def triage_upload(source, filename=None):
+    # Returns (Document, None) or (None, rejection reason). The file type
+    # comes from filename, PDF when there is none. PDFs are checked by
+    # triage_pdf first (PyPDF2 is imported on first use or in warm_up, not at
+    # startup); DOCX and text files only have to open.
+    kind = document_type(filename) or 'pdf'
+    if kind != 'pdf':
+        backend = DOCUMENT_BACKENDS[kind]
+        with STAGE_SECONDS.time(stage='triage'):
+            try:
+                return Document(backend, backend.open(source), source), None
+            except Exception as e:
+                print(f"Error reading {kind} file: {e}")
+                return None, 'unreadable_document'
+    
+    from triage import triage_pdf
+    with STAGE_SECONDS.time(stage='triage'):
+        reader, reason = triage_pdf(source, app.config['PDF_MAX_PAGES'], app.config['PDF_TRIAGE_SAMPLE_PAGES'])
+    if reason:
+        return None, reason
+    return open_pdf(reader), None
+
+def rejection_error(reason):
+    PDF_REJECTIONS.inc(reason=reason)
+    return {'error': PDF_REJECTION_ERRORS[reason][0], 'code': reason}
+
+def rejection_response(reason):
+    return jsonify(rejection_error(reason)), PDF_REJECTION_ERRORS[reason][1]
+
+def _extract_text_from_bytes(data, filename=None):
+    # Returns (text, None) or ('', rejection reason)
+    document, reason = triage_upload(io.BytesIO(data), filename)
+    if reason:
+        return '', reason
+    text = extract_text_from_pdf(document)
+    return text, None if text else 'no_text'
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+_in_extraction_worker = False
+
+def _mark_extraction_worker(config):
+    # Workers import this module afresh, so they are handed the parent's
+    # extraction settings as they were when the pool started
+    global _in_extraction_worker
+    _in_extraction_worker = True
+    app.config.update(config)
+
+def get_extraction_pool():
+    # PyPDF2 is pure Python and holds the GIL, so batches (and the pages of
+    # long documents) fan out to processes. The pool is created on first
+    # use, from whichever request or job thread needs it, so workers come
+    # from a forkserver (spawn where there is none) rather than a fork that
+    # could copy a lock another thread holds.
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            config = {key: value for key, value in app.config.items() if key.startswith(('EXTRACT_', 'PDF_', 'UPLOAD_SPOOL_'))}
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=app.config['BATCH_WORKERS'], mp_context=context,
+                initializer=_mark_extraction_worker, initargs=(config,)
+            )
+        return _extraction_pool
+
+def with_extraction_pool(call):
+    # Returns call(pool). A worker that died (a crash in an extraction
+    # library, an OOM kill) breaks the whole pool, so it is replaced and
+    # call retried once on the new one; a second break is raised.
+    global _extraction_pool
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        try:
+            return call(pool)
+        except BrokenProcessPool:
+            print("Extraction pool broke, starting a new one")
+            with _extraction_pool_lock:
+                if _extraction_pool is pool:
+                    _extraction_pool = None
+            pool.shutdown(wait=False)
+            if attempt:
+                raise
+
+def extract_texts_parallel(documents):
+    # documents is a list of (filename, bytes); (text, rejection reason)
+    # pairs come back in the same order
+    if len(documents) < 2 or app.config['BATCH_WORKERS'] < 2:
+        return [_extract_text_from_bytes(data, filename) for filename, data in documents]
+    chunksize = max(1, len(documents) // (app.config['BATCH_WORKERS'] * 4))
+    return with_extraction_pool(lambda pool: list(pool.map(
+        _extract_text_from_bytes,
+        [data for _, data in documents],
+        [filename for filename, _ in documents],
+        chunksize=chunksize
+    )))
+
+_caches = None
+
+def get_caches():
+    # Extracted text keyed by the upload's SHA-256, and analysis results keyed
+    # by (SHA-256, job_role), so a re-upload or a role switch skips the parse.
+    # 'jd' holds ad-hoc role definitions built from job descriptions.
+    global _caches
+    if _caches is None:
+        _caches = {
+            'text': LRUCache('text', app.config['TEXT_CACHE_MAX_BYTES'], app.config['CACHE_PATH']),
+            'result': LRUCache('result', app.config['RESULT_CACHE_MAX_BYTES'], app.config['CACHE_PATH']),
+            'jd': LRUCache('jd', app.config['JD_CACHE_MAX_BYTES'], app.config['CACHE_PATH'])
+        }
+    return _caches
+
+def hash_stream(stream):
+    digest = hashlib.sha256()
+    size = 0
+    with STAGE_SECONDS.time(stage='hash'):
+        for chunk in iter(lambda: stream.read(64 * 1024), b''):
+            digest.update(chunk)
+            size += len(chunk)
+        stream.seek(0)
+    UPLOAD_BYTES.observe(size)
+    return digest.hexdigest()
+
+def text_cache_key(digest, filename=None):
+    # The same bytes give different text read as a PDF and as a text file,
+    # so the type the filename selects is part of the key.
+    return f'{digest}:{document_type(filename) or "pdf"}'
+
+def extract_text_cached(source, digest, filename=None):
+    # Returns (text, None) or ('', rejection reason)
+    text_cache = get_caches()['text']
+    key = text_cache_key(digest, filename)
+    text = text_cache.get(key)
+    if text is None:
+        document, reason = triage_upload(source, filename)
+        if reason:
+            return '', reason
+        text = extract_text_from_pdf(document)
+        if not text:
+            return '', 'no_text'
+        text_cache.put(key, text)
+    return text, None
+
+def result_cache_key(digest, job_role, roles, filename=None):
+    # Results depend on the role definitions, so a reload starts a fresh key
+    # space, and on the text, so on the file type as well.
+    return f'{text_cache_key(digest, filename)}:{job_role}:{roles.version}'
+
+_duplicate_index = None
+
+def get_duplicate_index():
+    global _duplicate_index
+    if _duplicate_index is None:
+        from dedup import DuplicateIndex
+
+        _duplicate_index = DuplicateIndex(
+            app.config['DEDUP_THRESHOLD'], max_entries=app.config['DEDUP_MAX_ENTRIES']
+        )
+    return _duplicate_index
+
+def find_duplicate(text, digest, filename=None):
+    # Returns {'digest', 'filename', 'similarity'} for an earlier upload with
+    # near-identical text (a re-exported or lightly edited copy), or None,
+    # and indexes this text for later uploads. DEDUP_MODE 'off' skips it.
+    if app.config['DEDUP_MODE'] == 'off':
+        return None
+    index = get_duplicate_index()
+    with STAGE_SECONDS.time(stage='dedup'):
+        signature = index.hasher.signature(text)
+        if signature is None:
+            return None
+        match = index.query(signature, exclude=digest)
+        index.add(digest, signature, filename)
+    if match is None:
+        return None
+    return {'digest': match[0], 'filename': match[1], 'similarity': round(match[2], 3)}
+
+def analyze_cached(text, digest, job_role, filename=None, roles=None):
+    # A near-duplicate of an earlier upload is marked with 'duplicate_of';
+    # with DEDUP_MODE 'reuse' it also takes over that upload's cached result
+    # instead of being scored again.
+    if roles is None:
+        roles = get_roles()
+    result_cache = get_caches()['result']
+    key = result_cache_key(digest, job_role, roles, filename)
+    result = result_cache.get(key)
+    if result is None:
+        duplicate = find_duplicate(text, digest, filename)
+        if duplicate and app.config['DEDUP_MODE'] == 'reuse':
+            result = result_cache.get(result_cache_key(duplicate['digest'], job_role, roles, duplicate['filename']))
+        if duplicate:
+            DUPLICATES.inc(reused=str(result is not None).lower())
+        if result is None:
+            if job_role == '*':
+                result = analyze_all_roles(text, roles=roles)
+            else:
+                result = analyze_resume(text, job_role, roles=roles)
+        if duplicate:
+            result['duplicate_of'] = duplicate
+        result_cache.put(key, result)
+        record_candidate(digest, filename, text, job_role, result, roles)
+        record_analytics(digest, text, job_role, result, roles)
+    return result
+
+_candidate_store = None
+
+def get_candidate_store():
+    # None when CANDIDATE_DB_PATH is unset, which turns persistence off.
+    global _candidate_store
+    if _candidate_store is None and app.config['CANDIDATE_DB_PATH']:
+        _candidate_store = CandidateStore(app.config['CANDIDATE_DB_PATH'])
+    return _candidate_store
+
+def record_candidate(digest, filename, text, job_role, result, roles):
+    store = get_candidate_store()
+    if store is None:
+        return
+    
+    if job_role == '*':
+        analyses = {row['job_role']: (row['overall_score'], None) for row in result['rankings']}
+    else:
+        analyses = {job_role: (result['overall_score'], result)}
+    
+    try:
+        with STAGE_SECONDS.time(stage='store'):
+            if not store.has_candidate(digest):
+                terms = sorted(roles.matcher.find(text.lower()))
+                store.add_candidate(digest, filename, text, terms)
+            store.add_analyses(digest, analyses)
+    except sqlite3.Error as e:
+        print(f"Error storing candidate: {e}")
+
+_analytics = None
+
+def get_analytics():
+    # None when ANALYTICS_DIR is unset, which turns analytics off.
+    global _analytics
+    if _analytics is None and app.config['ANALYTICS_DIR']:
+        from analytics import ScoreAnalytics
+
+        _analytics = ScoreAnalytics(app.config['ANALYTICS_DIR'], SECTION_CUES, CONTACT_FIELDS)
+    return _analytics
+
+def record_analytics(digest, text, job_role, result, roles):
+    # Near-duplicates are the same candidate again, and ad-hoc roles are
+    # one-off, so neither is counted.
+    analytics = get_analytics()
+    if analytics is None or 'duplicate_of' in result or job_role.startswith('jd-'):
+        return
+    
+    try:
+        with STAGE_SECONDS.time(stage='analytics'):
+            found_terms = roles.matcher.find(text.lower())
+            if job_role == '*':
+                for row in result['rankings']:
+                    analytics.record(
+                        digest, roles[row['job_role']], row, result['sections'], result['contact_info'], found_terms
+                    )
+            else:
+                analytics.record(
+                    digest, roles[job_role], result, result['sections'], result['contact_info'], found_terms
+                )
+    except (OSError, ValueError) as e:
+        print(f"Error recording analytics: {e}")
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+CONTACT_FIELDS = ('email', 'phone', 'linkedin', 'github')
+
+# Section headings are plain substrings. Checking each one with `in` is
+# several times faster than one regex alternation, which CPython's re engine
+# cannot skip through quickly when the heading is missing.
+SECTION_CUES = {
+    'summary': ('summary', 'objective', 'profile'),
+    'experience': ('experience', 'employment', 'work history'),
+    'education': ('education', 'academic', 'degree', 'university', 'college'),
+    'skills': ('skills', 'competencies'),
+    'projects': ('projects', 'portfolio')
+}
+
+def detect_resume_features(text, text_lower=None):
+    # Role-independent signals, shared when one resume is scored for many roles.
+    if text_lower is None:
+        with STAGE_SECONDS.time(stage='lowercase'):
+            text_lower = text.lower()
+    
+    # Everything runs on the one lowercase copy; the email pattern already
+    # accepts either case, so no scan of the original text is needed.
+    started = time.perf_counter()
+    contact = {
+        'has_email': '@' in text_lower and bool(EMAIL_PATTERN.search(text_lower)),
+        'has_phone': bool(PHONE_PATTERN.search(text_lower)),
+        'has_linkedin': 'linkedin.com' in text_lower,
+        'has_github': 'github.com' in text_lower
+    }
+    sections = {
+        section: any(cue in text_lower for cue in cues)
+        for section, cues in SECTION_CUES.items()
+    }
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage='sections')
+    
+    return text_lower, contact, sections
+
+def analyze_resume(text, job_role, features=None, found_terms=None, roles=None):
+    if roles is None:
+        roles = get_roles()
+    role = roles[job_role]
+    if features is None:
+        features = detect_resume_features(text)
+    text_lower, contact, sections = features
+    if found_terms is None:
+        with STAGE_SECONDS.time(stage='match'):
+            found_terms = role.matcher.find(text_lower)
+    
+    found_keywords = [kw for kw, term in zip(role.keywords, role.keyword_terms) if term in found_terms]
+    keyword_score = (len(found_keywords) / role.keyword_total) * 100
+    
+    found_skills = [skill for skill, term in zip(role.skills, role.skill_terms) if term in found_terms]
+    skill_score = (len(found_skills) / role.skill_total) * 100
+    
+    found_experience = [exp for exp, term in zip(role.experience, role.experience_terms) if term in found_terms]
+    experience_score = (len(found_experience) / role.experience_total) * 100
+    
+    format_score = sum(contact.values()) * 25
+    section_score = (sum(sections.values()) / len(sections)) * 100
+    
+    overall_score = (
+        keyword_score * 0.35 +
+        skill_score * 0.25 +
+        experience_score * 0.20 +
+        format_score * 0.10 +
+        section_score * 0.10
+    )
+    
+    recommendations = generate_recommendations(
+        overall_score, sections, contact,
+        len(found_keywords), len(role.keywords)
+    )
+    
+    return {
+        'overall_score': round(overall_score),
+        'keyword_score': round(keyword_score),
+        'skill_score': round(skill_score),
+        'experience_score': round(experience_score),
+        'format_score': round(format_score),
+        'section_score': round(section_score),
+        'found_keywords': found_keywords[:20],
+        'missing_keywords': [kw for kw, term in zip(role.keywords, role.keyword_terms) if term not in found_terms][:20],
+        'found_skills': found_skills,
+        'missing_skills': [skill for skill, term in zip(role.skills, role.skill_terms) if term not in found_terms],
+        'sections': sections,
+        'contact_info': {
+            'email': contact['has_email'],
+            'phone': contact['has_phone'],
+            'linkedin': contact['has_linkedin'],
+            'github': contact['has_github']
+        },
+        'recommendations': recommendations
+    }
+
+def analyze_all_roles(text, features=None, found_terms=None, roles=None):
+    # One lowercase copy and one vocabulary scan, scored against every role.
+    if roles is None:
+        roles = get_roles()
+    if features is None:
+        features = detect_resume_features(text)
+    if found_terms is None:
+        with STAGE_SECONDS.time(stage='match'):
+            found_terms = roles.matcher.find(features[0])
+    
+    rankings = []
+    for role in roles:
+        result = analyze_resume(text, role.key, features, found_terms, roles)
+        rankings.append({
+            'job_role': role.key,
+            'role_name': role.name,
+            'overall_score': result['overall_score'],
+            'keyword_score': result['keyword_score'],
+            'skill_score': result['skill_score'],
+            'experience_score': result['experience_score'],
+            'format_score': result['format_score'],
+            'section_score': result['section_score']
+        })
+    rankings.sort(key=lambda row: (row['overall_score'], row['keyword_score']), reverse=True)
+    
+    return {
+        'best_match': rankings[0]['job_role'],
+        'rankings': rankings,
+        'sections': features[2],
+        'contact_info': {
+            'email': features[1]['has_email'],
+            'phone': features[1]['has_phone'],
+            'linkedin': features[1]['has_linkedin'],
+            'github': features[1]['has_github']
+        }
+    }
+
+class IncrementalScorer:
+    # Scores a resume page by page for one role, or for every role with '*'.
+    # Only the found terms, the contact and section flags and a short overlap
+    # from the previous page are kept, so memory is bounded by one page and
+    # terms split across a page break are still seen.
+    MIN_OVERLAP = 256
+    
+    def __init__(self, job_role, roles=None):
+        self.job_role = job_role
+        self.roles = roles if roles is not None else get_roles()
+        self.matcher = self.roles.matcher if job_role == '*' else self.roles[job_role].matcher
+        self.found_terms = set()
+        self.contact = None
+        self.sections = None
+        self.pages = 0
+        self.chars = 0
+        self._overlap = max([len(term) for term in self.matcher.terms] + [self.MIN_OVERLAP])
+        self._tail = ''
+    
+    def feed(self, page_text):
+        window = self._tail + ('\n' if self.pages else '') + page_text
+        window_lower = window.lower()
+        # the tail's first character was fully scanned with the previous page
+        # and is only there for the word-boundary check
+        self.found_terms |= self.matcher.find(window_lower, 1 if self._tail else 0)
+        
+        _, contact, sections = detect_resume_features(window, window_lower)
+        if self.contact is None:
+            self.contact, self.sections = contact, sections
+        else:
+            for key, present in contact.items():
+                self.contact[key] = self.contact[key] or present
+            for key, present in sections.items():
+                self.sections[key] = self.sections[key] or present
+        
+        self.pages += 1
+        self.chars += len(page_text)
+        self._tail = window[-(self._overlap + 1):]
+    
+    @property
+    def saturated(self):
+        # Nothing later in the document can change the score.
+        return (
+            self.contact is not None
+            and len(self.found_terms) == len(self.matcher.terms)
+            and all(self.contact.values())
+            and all(self.sections.values())
+        )
+    
+    def result(self):
+        features = (None, self.contact, self.sections)
+        if self.job_role == '*':
+            return analyze_all_roles(None, features, self.found_terms, self.roles)
+        return analyze_resume(None, self.job_role, features, self.found_terms, self.roles)
+
+def generate_recommendations(score, sections, contact, found_kw, total_kw):
+    recs = []
+    
+    if score < 60:
+        recs.append('Your ATS score is low. Focus on incorporating more relevant keywords and skills.')
+    elif score < 80:
+        recs.append('Good start! Add more role-specific keywords to improve your score.')
+    else:
+        recs.append('Excellent ATS score! Your resume is well-optimized.')
+    
+    if not sections['summary']:
+        recs.append('Add a professional summary highlighting your key qualifications.')
+    if not sections['experience']:
+        recs.append('Include a clear experience section with quantifiable achievements.')
+    if not sections['skills']:
+        recs.append('Add a dedicated technical skills section with relevant technologies.')
+    if not sections['projects']:
+        recs.append('Include projects showcasing your practical experience.')
+    
+    if not contact['has_email']:
+        recs.append('Add your email address for contact purposes.')
+    if not contact['has_linkedin']:
+        recs.append('Include your LinkedIn profile URL.')
+    if not contact['has_github']:
+        recs.append('Add your GitHub profile to showcase your code portfolio.')
+    
+    return recs
+
+# Result fields in their canonical order, for fields= and the compact format
+RESULT_FIELDS = (
+    'overall_score', 'keyword_score', 'skill_score', 'experience_score', 'format_score', 'section_score',
+    'found_keywords', 'missing_keywords', 'found_skills', 'missing_skills',
+    'sections', 'contact_info', 'recommendations', 'role_name', 'duplicate_of'
+)
+ALL_ROLES_FIELDS = ('best_match', 'rankings', 'sections', 'contact_info', 'duplicate_of')
+BATCH_FIELDS = ('filename',) + RESULT_FIELDS
+POOL_FIELDS = ('filename', 'score', 'relative_score')
+
+def read_output_options(allowed):
+    # fields= and format= from the query string or form; an Accept header
+    # asking for MessagePack also selects it. Returns (fields, format, None)
+    # or (None, None, error response).
+    output_format = request.values.get('format')
+    if output_format is None:
+        output_format = 'msgpack' if MSGPACK_MIMETYPE in request.headers.get('Accept', '') else 'json'
+    if output_format not in FORMATS:
+        return None, None, (jsonify({'error': f'Unknown format: {output_format}'}), 400)
+    if output_format == 'msgpack' and msgpack is None:
+        return None, None, (jsonify({'error': 'MessagePack support is not installed'}), 406)
+    
+    fields, message = parse_fields(request.values.get('fields', ''), allowed)
+    if message:
+        return None, None, (jsonify({'error': message}), 400)
+    return fields, output_format, None
+
+def render_output(payload, output_format):
+    if output_format == 'msgpack':
+        return Response(pack(payload), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload)
+
+def render_result(result, job_role, roles, fields, output_format):
+    # One analysis result (job_role '*' for every role) in the requested format
+    if job_role != '*':
+        result['role_name'] = roles[job_role].name
+    with STAGE_SECONDS.time(stage='serialize'):
+        if output_format == 'json':
+            return jsonify(project(result, fields))
+        fields = fields or list(ALL_ROLES_FIELDS if job_role == '*' else RESULT_FIELDS)
+        return render_output({
+            'version': roles.version,
+            'job_role': job_role,
+            'fields': fields,
+            'row': compact_rows([result], fields, roles[job_role] if job_role != '*' else None)[0]
+        }, output_format)
+
+def render_batch(body, roles, fields, output_format):
+    # A score_batch() body in the requested format
+    with STAGE_SECONDS.time(stage='serialize'):
+        if output_format == 'json':
+            body['results'] = [project(result, fields) for result in body['results']]
+            return jsonify(body)
+        fields = fields or list(BATCH_FIELDS if body['scoring'] == 'ats' else POOL_FIELDS)
+        role = roles[body['job_role']] if body['scoring'] == 'ats' else None
+        body['version'] = roles.version
+        body['fields'] = fields
+        body['rows'] = compact_rows(body.pop('results'), fields, role)
+        return render_output(body, output_format)
+
+_index_pages = {}
+
+@app.route('/')
+def index():
+    # The page only changes with the role list, so it is rendered and
+    # compressed once per role-set version; browsers revalidate it by ETag.
+    roles = get_roles()
+    page = _index_pages.get(roles.version)
+    if page is None:
+        html = render_template('index.html', job_roles={role.key: role for role in roles})
+        page = Asset(html.encode('utf-8'), 'text/html; charset=utf-8')
+        _index_pages.clear()
+        _index_pages[roles.version] = page
+    return page.response(request, 'no-cache')
+
+@app.route('/static/<path:filename>', endpoint='static')
+def static_asset(filename):
+    # Assets are linked with ?v=<content hash> (see add_asset_version), so a
+    # matching request can be cached for good; anything else revalidates.
+    asset = load_asset(app.config['STATIC_DIR'], filename)
+    if asset is None:
+        return jsonify({'error': 'Not found'}), 404
+    if request.args.get('v') == asset.etag:
+        cache_control = f"public, max-age={app.config['ASSET_MAX_AGE']}, immutable"
+    else:
+        cache_control = 'no-cache'
+    return asset.response(request, cache_control)
+
+@app.url_defaults
+def add_asset_version(endpoint, values):
+    if endpoint == 'static' and 'v' not in values:
+        asset = load_asset(app.config['STATIC_DIR'], values['filename'])
+        if asset is not None:
+            values['v'] = asset.etag
+
+def get_resume_file():
+    # Returns (uploaded file, None) or (None, error response)
+    if 'resume' not in request.files:
+        return None, (jsonify({'error': 'No file uploaded'}), 400)
+    
+    file = request.files['resume']
+    
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not document_type(file.filename):
+        return None, (jsonify({'error': 'Please upload a PDF, DOCX or TXT file'}), 400)
+    
+    return file, None
+
+def read_resume_upload():
+    # Returns (text, sha256 hex digest, None) or (None, None, error response)
+    file, error = get_resume_file()
+    if error:
+        return None, None, error
+    
+    digest = hash_stream(file.stream)
+    text, reason = extract_text_cached(file.stream, digest, file.filename)
+    
+    if reason:
+        return None, None, rejection_response(reason)
+    
+    return text, digest, None
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    try:
+        job_role = request.form.get('job_role', 'data-scientist')
+        g.job_role = job_role
+        roles = resolve_roles(job_role)
+        if job_role != '*' and job_role not in roles:
+            return jsonify({'error': f'Unknown job role: {job_role}'}), 400
+        
+        allowed = ALL_ROLES_FIELDS if job_role == '*' else RESULT_FIELDS
+        fields, output_format, error = read_output_options(allowed)
+        if error:
+            return error
+        
+        if is_async_request():
+            file, error = get_resume_file()
+            if error:
+                return error
+            return job_accepted(get_job_queue().submit(
+                'analyze', {'job_role': job_role}, [(file.filename, file.stream)]
+            ))
+        
+        text, digest, error = read_resume_upload()
+        if error:
+            return error
+        
+        result = analyze_cached(text, digest, job_role, request.files['resume'].filename, roles)
+        return render_result(result, job_role, roles, fields, output_format)
+    
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    # Newline-delimited JSON: a partial result after every parsed page, then
+    # the final result. Parsing stops early once the score can no longer change.
+    job_role = request.form.get('job_role', 'data-scientist')
+    g.job_role = job_role
+    roles = resolve_roles(job_role)
+    if job_role != '*' and job_role not in roles:
+        return jsonify({'error': f'Unknown job role: {job_role}'}), 400
+    
+    file, error = get_resume_file()
+    if error:
+        return error
+    
+    filename = file.filename
+    digest = hash_stream(file.stream)
+    result_cache = get_caches()['result']
+    key = result_cache_key(digest, job_role, roles, filename)
+    result = result_cache.get(key)
+    document = None
+    if result is None:
+        document, reason = triage_upload(file.stream, filename)
+        if reason:
+            return rejection_response(reason)
+    
+    def generate(result):
+        if result is not None:
+            if job_role != '*':
+                result['role_name'] = roles[job_role].name
+            yield json.dumps({'done': True, 'result': result}) + '\n'
+            return
+        
+        scorer = IncrementalScorer(job_role, roles)
+        try:
+            for page_text in iter_pdf_pages(document):
+                scorer.feed(page_text)
+                if scorer.saturated:
+                    break
+                yield json.dumps({'pages': scorer.pages, 'done': False, 'result': scorer.result()}) + '\n'
+        except Exception as e:
+            print(f"Error extracting text: {e}")
+        
+        if not scorer.chars:
+            PDF_REJECTIONS.inc(reason='no_text')
+            yield json.dumps({'error': PDF_REJECTION_ERRORS['no_text'][0], 'code': 'no_text'}) + '\n'
+            return
+        result = scorer.result()
+        if job_role != '*':
+            result['role_name'] = roles[job_role].name
+        yield json.dumps({'done': True, 'result': result}) + '\n'
+        
+        # Stored like analyze_cached does, since /analyze shares this cache
+        # key, once the client has its result. The pages were scored and
+        # dropped one at a time (and maybe not all read), so the text stored
+        # is the whole document's, extracted again or from the text cache.
+        text_cache = get_caches()['text']
+        text_key = text_cache_key(digest, filename)
+        text = text_cache.get(text_key)
+        if text is None:
+            text = extract_text_from_pdf(document)
+            if not text:
+                return
+            text_cache.put(text_key, text)
+        duplicate = find_duplicate(text, digest, filename)
+        if duplicate:
+            DUPLICATES.inc(reused='false')
+            result['duplicate_of'] = duplicate
+        result_cache.put(key, result)
+        record_candidate(digest, filename, text, job_role, result, roles)
+        record_analytics(digest, text, job_role, result, roles)
+    
+    return Response(stream_with_context(generate(result)), mimetype='application/x-ndjson')
+
+def read_zip_documents(stream, filename, documents):
+    # Appends (member name, bytes) for each PDF, DOCX or TXT in the archive to
+    # documents; returns None or an error response.
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        return jsonify({'error': f'{filename} is not a valid zip archive'}), 400
+    total_size = sum(len(data) for _, data in documents)
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not document_type(info.filename):
+                continue
+            total_size += info.file_size
+            if total_size > app.config['BATCH_MAX_UNCOMPRESSED_SIZE']:
+                return jsonify({'error': 'Batch is too large once uncompressed'}), 413
+            try:
+                documents.append((info.filename, archive.read(info)))
+            except (zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError) as e:
+                # corrupt (bad CRC or deflate data), encrypted or an
+                # unsupported compression method
+                return jsonify({'error': f'{info.filename} in {filename} cannot be read: {e}'}), 400
+    return None
+
+def check_batch_size(documents):
+    max_files = app.config['BATCH_MAX_FILES']
+    if len(documents) > max_files:
+        return jsonify({'error': f'A batch may contain at most {max_files} resumes'}), 413
+    if not documents:
+        return jsonify({'error': 'No resumes uploaded'}), 400
+    return None
+
+def read_batch_uploads():
+    # Returns ([(filename, bytes), ...], None) or (None, error response).
+    # Accepts any number of resumes (PDF, DOCX or TXT) under 'resumes'
+    # and/or zip archives of them.
+    documents = []
+    max_files = app.config['BATCH_MAX_FILES']
+    
+    for file in request.files.getlist('resumes'):
+        if file.filename == '':
+            continue
+        name = file.filename.lower()
+        
+        if name.endswith('.zip'):
+            error = read_zip_documents(file.stream, file.filename, documents)
+            if error:
+                return None, error
+        elif document_type(name):
+            documents.append((file.filename, file.read()))
+        else:
+            return None, (jsonify({'error': f'{file.filename} is not a PDF, DOCX, TXT or zip file'}), 400)
+        
+        if len(documents) > max_files:
+            break
+    
+    error = check_batch_size(documents)
+    if error:
+        return None, error
+    
+    return documents, None
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        job_role = request.form.get('job_role', 'data-scientist')
+        g.job_role = job_role
+        roles = resolve_roles(job_role)
+        if job_role not in roles:
+            return jsonify({'error': f'Unknown job role: {job_role}'}), 400
+        
+        # 'ats' ranks by analyze_resume; 'bm25' and 'tfidf' rank the batch as a pool
+        scoring = request.form.get('scoring', 'ats')
+        if scoring not in ('ats', 'bm25', 'tfidf'):
+            return jsonify({'error': f'Unknown scoring mode: {scoring}'}), 400
+        
+        allowed = BATCH_FIELDS if scoring == 'ats' else POOL_FIELDS
+        fields, output_format, error = read_output_options(allowed)
+        if error:
+            return error
+        if fields and 'filename' not in fields:
+            fields.insert(0, 'filename')
+        
+        documents, error = read_batch_uploads()
+        if error:
+            return error
+        
+        if is_async_request():
+            return job_accepted(get_job_queue().submit(
+                'batch', {'job_role': job_role, 'scoring': scoring}, documents
+            ))
+        
+        body = score_batch(documents, job_role, scoring, roles)
+        return render_batch(body, roles, fields, output_format)
+    
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def score_batch(documents, job_role, scoring, roles):
+    # documents is a list of (filename, bytes); returns the response body
+    text_cache = get_caches()['text']
+    digests = [hashlib.sha256(data).hexdigest() for _, data in documents]
+    keys = [text_cache_key(digest, filename) for (filename, _), digest in zip(documents, digests)]
+    texts = [text_cache.get(key) for key in keys]
+    reasons = [None] * len(documents)
+    pending = [i for i, text in enumerate(texts) if text is None]
+    extracted = extract_texts_parallel([documents[i] for i in pending])
+    for i, (text, reason) in zip(pending, extracted):
+        texts[i] = text
+        reasons[i] = reason
+        if text:
+            text_cache.put(keys[i], text)
+    
+    failed = []
+    extracted = []
+    for (filename, _), digest, text, reason in zip(documents, digests, texts, reasons):
+        if text:
+            extracted.append((filename, digest, text))
+        else:
+            failed.append(dict(rejection_error(reason), filename=filename))
+    
+    results = []
+    if scoring in ('bm25', 'tfidf'):
+        with STAGE_SECONDS.time(stage='rank'):
+            ranking = rank_texts([text for _, _, text in extracted], job_role, scoring, roles)
+        for i, score, relative_score in ranking:
+            results.append({
+                'filename': extracted[i][0],
+                'score': round(score, 4),
+                'relative_score': round(relative_score)
+            })
+    else:
+        for filename, digest, text in extracted:
+            result = analyze_cached(text, digest, job_role, filename, roles)
+            result['filename'] = filename
+            results.append(result)
+        results.sort(key=lambda result: result['overall_score'], reverse=True)
+    
+    return {
+        'job_role': job_role,
+        'role_name': roles[job_role].name,
+        'scoring': scoring,
+        'count': len(results),
+        'results': results,
+        'failed': failed
+    }
+
+@app.route('/analyze/all', methods=['POST'])
+def analyze_all():
+    g.job_role = '*'
+    try:
+        fields, output_format, error = read_output_options(ALL_ROLES_FIELDS)
+        if error:
+            return error
+        
+        text, digest, error = read_resume_upload()
+        if error:
+            return error
+        
+        roles = get_roles()
+        result = analyze_cached(text, digest, '*', request.files['resume'].filename, roles)
+        return render_result(result, '*', roles, fields, output_format)
+    
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/search')
+def search():
+    # ?q= takes an FTS5 query ("kubeflow AND mlflow", "deep learning" OR nlp);
+    # ?terms=kubeflow,mlflow&op=and builds one from a plain term list.
+    # mode=ranked (default) orders by BM25, mode=boolean by recency, or by
+    # score when job_role is given.
+    store = get_candidate_store()
+    if store is None:
+        return jsonify({'error': 'Candidate storage is disabled'}), 404
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        terms = [term.strip() for term in request.args.get('terms', '').split(',') if term.strip()]
+        operator = ' OR ' if request.args.get('op', 'and').lower() == 'or' else ' AND '
+        query = operator.join('"' + term.replace('"', '""') + '"' for term in terms)
+    if not query:
+        return jsonify({'error': 'Provide q or terms'}), 400
+    
+    job_role = request.args.get('job_role') or None
+    if job_role and job_role not in resolve_roles(job_role):
+        return jsonify({'error': f'Unknown job role: {job_role}'}), 400
+    
+    limit = max(1, min(request.args.get('limit', 20, type=int), app.config['SEARCH_MAX_RESULTS']))
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    ranked = request.args.get('mode', 'ranked') != 'boolean'
+    
+    started = time.perf_counter()
+    try:
+        results = store.search(query, ranked, job_role, limit, offset)
+    except sqlite3.OperationalError as e:
+        return jsonify({'error': f'Invalid search query: {e}'}), 400
+    
+    return jsonify({
+        'query': query,
+        'count': len(results),
+        'results': results,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
+@app.route('/analytics')
+def analytics_summary():
+    # Score distribution, most often missing and found keywords, and how
+    # often each section and contact detail was detected, per role, over
+    # every resume analyzed so far. ?job_role= limits it to one role,
+    # ?bins= sets the histogram resolution and ?top= the keyword list length.
+    store = get_analytics()
+    if store is None:
+        return jsonify({'error': 'Analytics is disabled'}), 404
+    
+    bins = request.args.get('bins', 10, type=int)
+    top = request.args.get('top', 10, type=int)
+    if not 1 <= bins <= 100:
+        return jsonify({'error': 'bins must be between 1 and 100'}), 400
+    if not 0 <= top <= 100:
+        return jsonify({'error': 'top must be between 0 and 100'}), 400
+    
+    roles = get_roles()
+    job_role = request.args.get('job_role') or None
+    if job_role:
+        job_roles = [job_role]
+    else:
+        job_roles = [role.key for role in roles]
+        job_roles += [key for key in store.roles() if key not in roles]
+    
+    started = time.perf_counter()
+    summaries = []
+    for key in job_roles:
+        summary = store.summary(key, bins, top) or {'job_role': key, 'count': 0}
+        summary['role_name'] = roles[key].name if key in roles else None
+        summaries.append(summary)
+    if job_role and not summaries[0]['count'] and job_role not in roles:
+        return jsonify({'error': f'Unknown job role: {job_role}'}), 400
+    
+    return jsonify({
+        'roles': summaries,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
+_job_queue = None
+
+def get_job_queue():
+    # Started on first use, which also resumes jobs queued before a restart.
+    # With JOB_RUN_WORKERS off, this process only submits and reports jobs
+    # and another one (serve.py --jobs) runs them.
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            app.config['JOBS_DB_PATH'],
+            app.config['JOBS_DIR'],
+            run_job,
+            workers=app.config['JOB_WORKERS'],
+            poll_seconds=app.config['JOB_POLL_SECONDS'],
+            retention_seconds=app.config['JOB_RETENTION_SECONDS'],
+            max_attempts=app.config['JOB_MAX_ATTEMPTS']
+        )
+        if app.config['JOB_RUN_WORKERS']:
+            _job_queue.start()
+    return _job_queue
+
+def stop_job_queue():
+    # Waits for running jobs to finish; for a clean process exit
+    if _job_queue is not None:
+        _job_queue.stop()
+
+def run_job(kind, params, files):
+    # Runs on a job worker thread; returns (result, None) or (None, error)
+    job_role = params['job_role']
+    roles = resolve_roles(job_role)
+    if job_role != '*' and job_role not in roles:
+        return None, {'error': f'Unknown job role: {job_role}'}
+    
+    if kind == 'batch':
+        documents = []
+        for filename, path in files:
+            with open(path, 'rb') as f:
+                documents.append((filename, f.read()))
+        return score_batch(documents, job_role, params['scoring'], roles), None
+    
+    filename, path = files[0]
+    with open(path, 'rb') as f:
+        digest = hash_stream(f)
+        text, reason = extract_text_cached(f, digest, filename)
+    if reason:
+        return None, rejection_error(reason)
+    result = analyze_cached(text, digest, job_role, filename, roles)
+    if job_role != '*':
+        result['role_name'] = roles[job_role].name
+    return result, None
+
+def is_async_request():
+    return request.values.get('async', '').lower() in ('1', 'true', 'yes')
+
+def job_accepted(job_id):
+    status_url = url_for('get_job', job_id=job_id)
+    response = jsonify({
+        'id': job_id,
+        'status': 'queued',
+        'status_url': status_url,
+        'events_url': url_for('job_events', job_id=job_id)
+    })
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    # Server-sent events: a 'status' event whenever the job's status changes,
+    # ending with the finished job. Each stream is a short long-poll, cut
+    # after JOB_EVENTS_MAX_SECONDS so it does not hold a worker for long;
+    # EventSource then reconnects with the Last-Event-ID it saw, and a job
+    # already reported finished gets a 204, which stops the reconnects.
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    def event_id(job):
+        # a retried job goes back through queued and running
+        return f"{job['status']}:{job['attempts']}"
+    
+    last_id = request.headers.get('Last-Event-ID')
+    if job['status'] in ('done', 'failed') and last_id == event_id(job):
+        return '', 204
+    
+    def generate():
+        nonlocal last_id
+        deadline = time.monotonic() + app.config['JOB_EVENTS_MAX_SECONDS']
+        yield f"retry: {int(app.config['JOB_POLL_SECONDS'] * 1000)}\n\n"
+        while True:
+            job = queue.get(job_id)
+            if job is None:
+                return
+            if event_id(job) != last_id:
+                last_id = event_id(job)
+                yield f'event: status\nid: {last_id}\ndata: {json.dumps(job)}\n\n'
+            if job['status'] in ('done', 'failed') or time.monotonic() >= deadline:
+                return
+            time.sleep(app.config['JOB_POLL_SECONDS'])
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+_upload_store = None
+# per upload: the pool futures extracting its zip members early, and the
+# count and size of those members so far
+_early_extractions = {}
+_early_extraction_totals = {}
+_early_extractions_lock = threading.Lock()
+
+def get_upload_store():
+    global _upload_store
+    if _upload_store is None:
+        _upload_store = UploadStore(
+            app.config['UPLOADS_DIR'],
+            app.config['UPLOAD_MAX_SIZE'],
+            retention_seconds=app.config['UPLOAD_RETENTION_SECONDS'],
+            member_handler=extract_upload_member,
+            member_extensions=tuple(DOCUMENT_TYPES),
+            delete_handler=forget_early_extractions
+        )
+    return _upload_store
+
+def extract_upload_member(upload_id, name, data):
+    # A resume inside a zip bundle finished arriving: extract it in the
+    # background while later chunks come in, so the commit mostly finds
+    # its text cached. Returns False, which stops the scan, once the bundle
+    # holds more than a batch may (the commit will reject it anyway).
+    with _early_extractions_lock:
+        totals = _early_extraction_totals.setdefault(upload_id, [0, 0])
+        totals[0] += 1
+        totals[1] += len(data)
+    if totals[0] > app.config['BATCH_MAX_FILES'] or totals[1] > app.config['BATCH_MAX_UNCOMPRESSED_SIZE']:
+        return False
+    key = text_cache_key(hashlib.sha256(data).hexdigest(), name)
+    if get_caches()['text'].get(key) is not None:
+        return
+    try:
+        future = with_extraction_pool(lambda pool: pool.submit(_extract_text_from_bytes, data, name))
+    except BrokenProcessPool:
+        # left to the commit
+        return
+    with _early_extractions_lock:
+        _early_extractions.setdefault(upload_id, set()).add(future)
+    future.add_done_callback(lambda future: cache_extracted_text(upload_id, key, future))
+
+def cache_extracted_text(upload_id, key, future):
+    with _early_extractions_lock:
+        _early_extractions.get(upload_id, set()).discard(future)
+    if future.exception() is None and future.result()[0]:
+        get_caches()['text'].put(key, future.result()[0])
+
+def take_early_extractions(upload_id):
+    with _early_extractions_lock:
+        return list(_early_extractions.pop(upload_id, ()))
+
+def forget_early_extractions(upload_id):
+    # The upload is gone (deleted, committed or expired); extractions still
+    # running finish on their own and only fill the text cache.
+    with _early_extractions_lock:
+        _early_extractions.pop(upload_id, None)
+        _early_extraction_totals.pop(upload_id, None)
+
+def upload_error(error, offset=None):
+    message, code = UPLOAD_ERRORS[error]
+    body = {'error': message, 'code': error}
+    if offset is not None:
+        body['offset'] = offset
+    return jsonify(body), code
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    # Starts a chunked upload of one resume or a zip of resumes. Send the file
+    # with PUT /uploads/<id>?offset=<bytes received so far>, any number of
+    # chunks in order; after a dropped connection GET /uploads/<id> gives
+    # the offset to carry on from. POST /uploads/<id>/commit then analyzes
+    # it like /analyze (a resume) or /analyze/batch (a zip).
+    data = request.get_json(silent=True)
+    if data is None:
+        data = request.form
+    elif not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    filename = data.get('filename', '')
+    if not document_type(filename) and not filename.lower().endswith('.zip'):
+        return jsonify({'error': 'Please upload a PDF, DOCX, TXT or zip file'}), 400
+    size = data.get('size')
+    if size is not None:
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'size must be a number of bytes'}), 400
+        if size < 0:
+            return jsonify({'error': 'size must be a number of bytes'}), 400
+        if size > app.config['UPLOAD_MAX_SIZE']:
+            return upload_error('too_large')
+    
+    upload_id = get_upload_store().create(filename, size)
+    upload_url = url_for('get_upload', upload_id=upload_id)
+    response = jsonify(dict(
+        get_upload_store().info(upload_id),
+        upload_url=upload_url,
+        max_chunk_size=app.config['UPLOAD_CHUNK_MAX_SIZE']
+    ))
+    response.status_code = 201
+    response.headers['Location'] = upload_url
+    return response
+
+@app.route('/uploads/<upload_id>')
+def get_upload(upload_id):
+    upload = get_upload_store().info(upload_id)
+    if upload is None:
+        return upload_error('not_found')
+    return jsonify(upload)
+
+@app.route('/uploads/<upload_id>', methods=['PUT'])
+def put_upload_chunk(upload_id):
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'offset is required'}), 400
+    if (request.content_length or 0) > app.config['UPLOAD_CHUNK_MAX_SIZE']:
+        return upload_error('chunk_too_large')
+    
+    offset, error = get_upload_store().append(
+        upload_id, offset, request.stream, app.config['UPLOAD_CHUNK_MAX_SIZE']
+    )
+    if error:
+        return upload_error(error, offset)
+    return jsonify({'id': upload_id, 'offset': offset})
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    store = get_upload_store()
+    if store.info(upload_id) is None:
+        return upload_error('not_found')
+    store.delete(upload_id)
+    return '', 204
+
+@app.route('/uploads/<upload_id>/commit', methods=['POST'])
+def commit_upload(upload_id):
+    # Takes job_role, scoring (zip bundles), fields, format and async like
+    # the /analyze endpoints, plus an optional sha256 of the whole file.
+    try:
+        store = get_upload_store()
+        upload, error = store.seal(upload_id)
+        if error:
+            return upload_error(error)
+        expected = request.form.get('sha256', '').lower()
+        if expected and expected != upload['sha256']:
+            return jsonify({'error': 'Upload does not match the given sha256', 'sha256': upload['sha256']}), 422
+        
+        job_role = request.form.get('job_role', 'data-scientist')
+        g.job_role = job_role
+        roles = resolve_roles(job_role)
+        is_bundle = upload['filename'].lower().endswith('.zip')
+        if (job_role == '*' and is_bundle) or (job_role != '*' and job_role not in roles):
+            return jsonify({'error': f'Unknown job role: {job_role}'}), 400
+        
+        if is_bundle:
+            scoring = request.form.get('scoring', 'ats')
+            if scoring not in ('ats', 'bm25', 'tfidf'):
+                return jsonify({'error': f'Unknown scoring mode: {scoring}'}), 400
+            fields, output_format, error = read_output_options(BATCH_FIELDS if scoring == 'ats' else POOL_FIELDS)
+            if error:
+                return error
+            if fields and 'filename' not in fields:
+                fields.insert(0, 'filename')
+            
+            documents = []
+            with store.open(upload_id) as f:
+                error = read_zip_documents(f, upload['filename'], documents) or check_batch_size(documents)
+            if error:
+                return error
+            if is_async_request():
+                job_id = get_job_queue().submit('batch', {'job_role': job_role, 'scoring': scoring}, documents)
+                store.delete(upload_id)
+                return job_accepted(job_id)
+            # let extraction that started while chunks were arriving finish
+            wait(take_early_extractions(upload_id))
+            body = score_batch(documents, job_role, scoring, roles)
+            store.delete(upload_id)
+            return render_batch(body, roles, fields, output_format)
+        
+        fields, output_format, error = read_output_options(ALL_ROLES_FIELDS if job_role == '*' else RESULT_FIELDS)
+        if error:
+            return error
+        if is_async_request():
+            with store.open(upload_id) as f:
+                job_id = get_job_queue().submit('analyze', {'job_role': job_role}, [(upload['filename'], f)])
+            store.delete(upload_id)
+            return job_accepted(job_id)
+        
+        UPLOAD_BYTES.observe(upload['size'])
+        with store.open(upload_id) as f:
+            text, reason = extract_text_cached(f, upload['sha256'], upload['filename'])
+        if reason:
+            store.delete(upload_id)
+            return rejection_response(reason)
+        result = analyze_cached(text, upload['sha256'], job_role, upload['filename'], roles)
+        store.delete(upload_id)
+        return render_result(result, job_role, roles, fields, output_format)
+    
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or 'unknown'
+    if endpoint == 'metrics_endpoint' or 'request_started' not in g:
+        return response
+    
+    # the handler records the role it read, so the body is never parsed
+    # here (an oversized upload would raise inside this hook)
+    job_role = g.get('job_role', '')
+    if job_role:
+        if job_role.startswith('jd-'):
+            # one label for every ad-hoc role keeps the series count bounded
+            job_role = 'adhoc'
+        elif job_role != '*' and job_role not in get_roles():
+            job_role = 'unknown'
+    
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+    REQUESTS.inc(endpoint=endpoint, job_role=job_role, status=response.status_code)
+    if response.status_code >= 400:
+        ERRORS.inc(endpoint=endpoint, job_role=job_role)
+    METRICS.flush()
+    return response
+
+def collect_cache_metrics():
+    stats = {name: cache.stats() for name, cache in get_caches().items()}
+    lines = []
+    for field, kind, help_text in [
+        ('hits', 'counter', 'Cache lookups that found an entry.'),
+        ('misses', 'counter', 'Cache lookups that found nothing.'),
+        ('evictions', 'counter', 'Entries evicted to stay under the byte cap.'),
+        ('entries', 'gauge', 'Entries currently cached.'),
+        ('bytes', 'gauge', 'Encoded size of the cached entries.'),
+        ('hit_rate', 'gauge', 'Fraction of lookups that were hits.')
+    ]:
+        name = f'ats_cache_{field}_total' if kind == 'counter' else f'ats_cache_{field}'
+        samples = [({'cache': cache}, cache_stats[field]) for cache, cache_stats in stats.items()]
+        lines.extend(gauge_lines(name, help_text, samples, kind))
+    return lines
+
+METRICS.add_collector(collect_cache_metrics)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/roles')
+def list_roles():
+    roles = get_roles()
+    return jsonify({
+        'version': roles.version,
+        'roles': {role.key: role.as_dict() for role in roles}
+    })
+
+@app.route('/roles/adhoc', methods=['POST'])
+def create_adhoc_role():
+    # Builds a role from a job description, given as JSON or form fields:
+    # description, optional name, and optional keywords/skills/experience
+    # lists to add. The returned id works as job_role in /analyze,
+    # /analyze/stream and /analyze/batch; the same description always
+    # gets the same id.
+    data = request.get_json(silent=True)
+    if data is None:
+        data = request.form
+    elif not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    description = data.get('description') or ''
+    if not isinstance(description, str) or not description.strip():
+        return jsonify({'error': 'No job description provided'}), 400
+    if len(description) > app.config['JD_MAX_CHARS']:
+        return jsonify({'error': 'Job description is too long'}), 413
+    
+    extra = {}
+    for category in ('keywords', 'skills', 'experience'):
+        terms = data.getlist(category) if hasattr(data, 'getlist') else data.get(category, [])
+        if not isinstance(terms, list) or not all(isinstance(term, str) and term.strip() for term in terms):
+            return jsonify({'error': f'{category} must be a list of strings'}), 400
+        extra[category] = [term.strip() for term in terms]
+    
+    try:
+        definition = definition_from_description(
+            description, get_roles(), data.get('name'), extra, app.config['JD_MAX_EXTRA_TERMS']
+        )
+        role_id = adhoc_role_id(definition)
+        role_set = ADHOC_ROLES.get(role_id) or RoleSet({role_id: definition})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    get_caches()['jd'].put(role_id, definition)
+    ADHOC_ROLES.put(role_id, role_set)
+    return jsonify({'id': role_id, 'role': role_set[role_id].as_dict()}), 201
+
+@app.route('/roles/<role_id>')
+def get_role(role_id):
+    roles = resolve_roles(role_id)
+    if role_id not in roles:
+        return jsonify({'error': f'Unknown job role: {role_id}'}), 404
+    return jsonify({'id': role_id, 'version': roles.version, 'role': roles[role_id].as_dict()})
+
+@app.route('/jobs/stats')
+def job_stats():
+    return jsonify(get_job_queue().stats())
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify({name: cache.stats() for name, cache in get_caches().items()})
+
+def warm_up(documents=()):
+    # Loads and compiles the role files, imports PyPDF2, the configured PDF
+    # backend and numpy, runs every role's matcher, feature detection, pool
+    # ranking and JSON encoding once, renders the UI and extracts the given
+    # PDFs (bytes), so the first real request pays for none of it. It opens
+    # no caches, databases, pools or threads, which keeps it safe to call in
+    # a parent process before forking workers.
+    started = time.perf_counter()
+    import triage  # PyPDF2, even when no documents are given
+    importlib.import_module(get_pdf_backend().module)
+    roles = get_roles()
+    texts = []
+    for data in documents:
+        document, reason = triage_upload(io.BytesIO(data))
+        if reason is None:
+            # serially, as extract_text_from_pdf could start the pool
+            texts.append('\n'.join(iter_pdf_pages(document)))
+    sample = ' '.join(term for role in roles for term in role.matcher.terms)
+    texts.append(f'Summary Experience Skills Projects jordan@example.com +1 555 123 4567 {sample}')
+    for text in texts:
+        analyze_all_roles(text, roles=roles)
+        IncrementalScorer('*', roles).feed(text)
+    for role in roles:
+        rank_texts(texts, role.key, 'bm25', roles)
+        rank_texts(texts, role.key, 'tfidf', roles)
+    get_duplicate_index().hasher.signature(sample)
+    with app.test_request_context():
+        jsonify(analyze_resume(texts[0], next(iter(roles)).key, roles=roles))
+        index()
+    print(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+if __name__ == '__main__':
+    print("Starting ATS Analyzer on http://localhost:5000")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
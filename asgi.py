@@ -0,0 +1,202 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from app import app, get_job_queue, stop_job_queue, warm_up
+
+# ASGI entry point, e.g. `uvicorn asgi:application --workers 4`.
+#
+# Request bodies are received on the event loop, so slow uploads no longer hold
+# a worker thread. The Flask app itself (PDF extraction and scoring) then runs
+# in a bounded thread pool. When every worker is busy and ASGI_MAX_QUEUE more
+# requests are already waiting, new requests get 503 straight away, and a
+# request that does not start responding within ASGI_REQUEST_TIMEOUT seconds
+# gets 504.
+
+_DONE = object()
+_DISCONNECTED = object()
+
+
+class AsyncFlaskApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.max_workers = flask_app.config['ASGI_WORKERS']
+        self.max_queue = flask_app.config['ASGI_MAX_QUEUE']
+        self.timeout = flask_app.config['ASGI_REQUEST_TIMEOUT']
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ats-worker')
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                warm_up()
+                # resume background jobs left queued by the previous process
+                get_job_queue()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                stop_job_queue()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            await _send_error(send, 503, b'{"error": "Server is busy, please retry"}', [(b'retry-after', b'5')])
+            return
+
+        self.in_flight += 1
+        dispatched = False
+        try:
+            body = await self._receive_body(receive)
+            if body is _DISCONNECTED:
+                return
+            if body is None:
+                await _send_error(send, 413, b'{"error": "Upload is too large"}')
+                return
+            # from here the worker gives the slot back when it finishes, which
+            # may be after a 504 has already been sent
+            dispatched = True
+            await self._respond(_build_environ(scope, body), send)
+        finally:
+            if not dispatched:
+                self.in_flight -= 1
+
+    def _release(self):
+        self.in_flight -= 1
+
+    async def _receive_body(self, receive):
+        # Spooled like Flask's own upload buffering; None if over the size cap,
+        # _DISCONNECTED if the client went away before sending all of it.
+        max_size = self.flask_app.config['MAX_CONTENT_LENGTH']
+        body = SpooledTemporaryFile(max_size=self.flask_app.config['UPLOAD_SPOOL_MAX_SIZE'], mode='w+b')
+        received = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return _DISCONNECTED
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            if max_size is not None and received > max_size:
+                body.close()
+                return None
+            body.write(chunk)
+            more_body = message.get('more_body', False)
+        body.seek(0)
+        return body
+
+    async def _respond(self, environ, send):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def put(item):
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def run():
+            # Runs on a worker thread and hands the response back piece by
+            # piece, so streamed responses such as /analyze/stream stay streamed.
+            try:
+                def start_response(status, headers, exc_info=None):
+                    put(('start', status, headers))
+
+                result = self.flask_app.wsgi_app(environ, start_response)
+                try:
+                    for chunk in result:
+                        if chunk:
+                            put(('body', chunk))
+                finally:
+                    if hasattr(result, 'close'):
+                        result.close()
+            except Exception as e:
+                put(('error', e))
+            finally:
+                environ['wsgi.input'].close()
+                loop.call_soon_threadsafe(self._release)
+                put(_DONE)
+
+        future = self.executor.submit(run)
+
+        try:
+            item = await asyncio.wait_for(queue.get(), self.timeout)
+        except asyncio.TimeoutError:
+            # A request still waiting for a worker is dropped; one already
+            # running cannot be interrupted, keeps its slot until it finishes
+            # and its output is discarded.
+            if future.cancel():
+                self._release()
+            await _send_error(send, 504, b'{"error": "Request timed out"}')
+            return
+
+        if item is _DONE or item[0] == 'error':
+            await _send_error(send, 500, b'{"error": "Internal server error"}')
+            return
+
+        _, status, headers = item
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if item[0] == 'body':
+                await send({'type': 'http.response.body', 'body': item[1], 'more_body': True})
+            elif item[0] == 'error':
+                print(f"Error: {item[1]}")
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+def _build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name
+            environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+
+async def _send_error(send, status, body, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+application = AsyncFlaskApp(app)
@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Precompressed in-memory copies of the UI files. Each file is read and
+# compressed once (gzip, plus brotli when the module is installed) and
+# served with a content-hash ETag, so repeat visits cost a 304 and first
+# visits a fraction of the original bytes.
+
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+
+class Asset:
+    __slots__ = ('etag', 'mimetype', 'bodies', 'mtime')
+
+    def __init__(self, data, mimetype, mtime=None):
+        self.etag = hashlib.sha256(data).hexdigest()[:16]
+        self.mimetype = mimetype
+        self.mtime = mtime
+        self.bodies = {'identity': data}
+        if mimetype.startswith(TEXT_TYPES):
+            # only kept when they actually save bytes
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                self.bodies['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.bodies['br'] = compressed
+
+    def encoding_for(self, request):
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and request.accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, request, cache_control):
+        encoding = self.encoding_for(request)
+        response = Response(self.bodies[encoding], mimetype=self.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = cache_control
+        # each encoding is a different representation, so it gets its own tag
+        response.set_etag(self.etag if encoding == 'identity' else f'{self.etag}-{encoding}')
+        return response.make_conditional(request)
+
+
+_assets = {}
+_lock = threading.Lock()
+
+
+def load_asset(directory, filename):
+    # Returns the Asset for directory/filename, re-reading it only when the
+    # file's mtime changes, or None when there is no such file.
+    path = safe_join(directory, filename)
+    if path is None:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    asset = _assets.get(path)
+    if asset is not None and asset.mtime == mtime:
+        return asset
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if mimetype.startswith('text/'):
+        mimetype += '; charset=utf-8'
+    asset = Asset(data, mimetype, mtime)
+    with _lock:
+        _assets[path] = asset
+    return asset
@@ -0,0 +1,308 @@
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app as ats
+from extractors import PDF_BACKENDS, Document, available_pdf_backends
+from samples import synthetic_resume
+
+# Offline benchmark for the scoring path. Generates synthetic resume PDFs for
+# every role definition and reports extraction time, scoring time and
+# end-to-end /analyze latency through Flask's test client, as JSON.
+#
+#   python benchmark.py --pages 1 5 20 --concurrency 4 --output bench.json
+#
+# --compare-backends instead runs every installed PDF backend over the
+# synthetic corpus (or the PDFs in --corpus) and reports its throughput,
+# failures, and how closely its text and scores match PyPDF2's.
+#
+#   python benchmark.py --compare-backends --corpus resumes/ --job-role data-scientist
+
+def legacy_detect_resume_features(text):
+    # The original seven-scan section and contact detection, kept as the
+    # baseline for the feature-detection microbenchmark.
+    text_lower = text.lower()
+    contact = {
+        'has_email': bool(re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)),
+        'has_phone': bool(re.search(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)),
+        'has_linkedin': 'linkedin.com' in text_lower,
+        'has_github': 'github.com' in text_lower
+    }
+    sections = {
+        'summary': bool(re.search(r'(summary|objective|profile)', text_lower)),
+        'experience': bool(re.search(r'(experience|employment|work history)', text_lower)),
+        'education': bool(re.search(r'(education|academic|degree|university|college)', text_lower)),
+        'skills': bool(re.search(r'(skills|technical skills|competencies)', text_lower)),
+        'projects': bool(re.search(r'(projects|portfolio)', text_lower))
+    }
+    return text_lower, contact, sections
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(rank(50) * 1000, 3),
+        'p95_ms': round(rank(95) * 1000, 3),
+        'p99_ms': round(rank(99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def bench_stages(corpus, iterations):
+    report = {}
+    for page_count, documents in corpus.items():
+        extraction = []
+        scoring = []
+        features = []
+        legacy_features = []
+        for _ in range(iterations):
+            for job_role, pdf in documents:
+                elapsed, text = timed(ats.extract_text_from_pdf, io.BytesIO(pdf))
+                extraction.append(elapsed)
+                elapsed, _ = timed(ats.analyze_resume, text, job_role)
+                scoring.append(elapsed)
+                elapsed, current = timed(ats.detect_resume_features, text)
+                features.append(elapsed)
+                elapsed, legacy = timed(legacy_detect_resume_features, text)
+                legacy_features.append(elapsed)
+                if current[1:] != legacy[1:]:
+                    raise RuntimeError(f'feature detection disagrees with the legacy scans for {job_role}')
+        report[str(page_count)] = {
+            'bytes': round(statistics.fmean(len(pdf) for _, pdf in documents)),
+            'extraction': percentiles(extraction),
+            'scoring': percentiles(scoring),
+            'features': percentiles(features),
+            'features_legacy': percentiles(legacy_features),
+            'features_speedup': round(sum(legacy_features) / sum(features), 2)
+        }
+    return report
+
+
+def bench_end_to_end(corpus, iterations, concurrency):
+    requests = [
+        (job_role, pdf)
+        for documents in corpus.values()
+        for job_role, pdf in documents
+    ] * iterations
+
+    def post(item):
+        job_role, pdf = item
+        client = ats.app.test_client()
+        started = time.perf_counter()
+        response = client.post('/analyze', data={
+            'job_role': job_role,
+            'resume': (io.BytesIO(pdf), 'resume.pdf')
+        })
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f'/analyze returned {response.status_code}: {response.get_data(as_text=True)}')
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(post, requests))
+    wall = time.perf_counter() - started
+
+    report = percentiles(latencies)
+    report['concurrency'] = concurrency
+    report['throughput_rps'] = round(len(latencies) / wall, 2)
+    return report
+
+
+def token_similarity(text, reference):
+    # Jaccard similarity of the two texts' lowercase word sets
+    tokens = set(re.findall(r'\w+', text.lower()))
+    reference = set(re.findall(r'\w+', reference.lower()))
+    if not tokens and not reference:
+        return 1.0
+    return len(tokens & reference) / len(tokens | reference)
+
+
+def extract_with(backend, pdf):
+    # The capped text the app would extract with backend, and the pages read
+    pages = []
+    document = Document(backend, backend.open(io.BytesIO(pdf)))
+    for page_text in ats.iter_pdf_pages(document):
+        pages.append(page_text)
+    return '\n'.join(pages), len(pages)
+
+
+def compare_backends(documents, iterations):
+    # documents is a list of (job_role, pdf bytes); PyPDF2 is the reference
+    reference = PDF_BACKENDS['pypdf2']
+    expected = []
+    for job_role, pdf in documents:
+        text, _ = extract_with(reference, pdf)
+        expected.append((text, ats.analyze_resume(text, job_role)['overall_score']))
+
+    report = {}
+    for name in available_pdf_backends():
+        backend = PDF_BACKENDS[name]
+        extraction = []
+        pages = 0
+        failures = 0
+        similarity = []
+        score_deltas = []
+        for _ in range(iterations):
+            for (job_role, pdf), (reference_text, reference_score) in zip(documents, expected):
+                try:
+                    elapsed, (text, page_count) = timed(extract_with, backend, pdf)
+                except Exception as e:
+                    print(f"{name} failed: {e}", file=sys.stderr)
+                    failures += 1
+                    continue
+                if not text.strip():
+                    failures += 1
+                extraction.append(elapsed)
+                pages += page_count
+                similarity.append(token_similarity(text, reference_text))
+                score_deltas.append(abs(ats.analyze_resume(text, job_role)['overall_score'] - reference_score))
+        report[name] = {
+            'extraction': percentiles(extraction) if extraction else None,
+            'pages_per_second': round(pages / sum(extraction), 1) if extraction else None,
+            'failures': failures,
+            'token_similarity': {
+                'mean': round(statistics.fmean(similarity), 4),
+                'min': round(min(similarity), 4)
+            } if similarity else None,
+            'overall_score': {
+                'same': round(score_deltas.count(0) / len(score_deltas), 4),
+                'mean_difference': round(statistics.fmean(score_deltas), 2),
+                'max_difference': max(score_deltas)
+            } if score_deltas else None
+        }
+    return report
+
+
+def load_corpus(directory, job_role):
+    documents = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().endswith('.pdf'):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                documents.append((job_role, f.read()))
+    return documents
+
+
+def run_comparison(page_counts, iterations, seed, corpus=None, job_role='data-scientist'):
+    if corpus:
+        documents = load_corpus(corpus, job_role)
+    else:
+        rng = random.Random(seed)
+        documents = [
+            (role.key, synthetic_resume(rng, role, page_count))
+            for page_count in page_counts for role in ats.get_roles()
+        ]
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'pages': None if corpus else page_counts,
+            'corpus': corpus,
+            'documents': len(documents),
+            'iterations': iterations,
+            'seed': seed
+        },
+        'backends': compare_backends(documents, iterations)
+    }
+
+
+def run(page_counts, iterations, concurrency, seed, use_cache, parallel_pages=None):
+    with tempfile.TemporaryDirectory() as scratch:
+        # keep benchmark candidates out of the real candidate database and
+        # score analytics
+        ats.app.config['CANDIDATE_DB_PATH'] = f'{scratch}/candidates.db'
+        ats._candidate_store = None
+        ats.app.config['ANALYTICS_DIR'] = f'{scratch}/analytics'
+        ats._analytics = None
+        return _run(page_counts, iterations, concurrency, seed, use_cache, parallel_pages)
+
+
+def _run(page_counts, iterations, concurrency, seed, use_cache, parallel_pages):
+    ats.app.config['EXTRACT_PARALLEL_MIN_PAGES'] = parallel_pages
+    if not use_cache:
+        # Every request should pay for the full parse.
+        ats.app.config['TEXT_CACHE_MAX_BYTES'] = 0
+        ats.app.config['RESULT_CACHE_MAX_BYTES'] = 0
+        ats.app.config['CACHE_PATH'] = None
+        ats._caches = None
+
+    rng = random.Random(seed)
+    corpus = {
+        page_count: [(role.key, synthetic_resume(rng, role, page_count)) for role in ats.get_roles()]
+        for page_count in page_counts
+    }
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'pages': page_counts,
+            'iterations': iterations,
+            'concurrency': concurrency,
+            'seed': seed,
+            'cache': use_cache,
+            'parallel_pages': parallel_pages
+        },
+        'stages': bench_stages(corpus, iterations),
+        'end_to_end': bench_end_to_end(corpus, iterations, concurrency),
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        'peak_rss_mb': round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1
+        )
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark PDF extraction and resume scoring.')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 20], help='page counts to generate')
+    parser.add_argument('--iterations', type=int, default=5, help='passes over the corpus per stage')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent /analyze clients')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the synthetic corpus')
+    parser.add_argument('--cache', action='store_true', help='leave the text/result caches enabled')
+    parser.add_argument('--parallel-pages', type=int,
+                        help='split documents of at least this many pages across extraction processes')
+    parser.add_argument('--compare-backends', action='store_true',
+                        help='compare the installed PDF text extraction backends instead')
+    parser.add_argument('--corpus', help='directory of PDFs for --compare-backends (default: synthetic)')
+    parser.add_argument('--job-role', default='data-scientist', help='role to score --corpus PDFs against')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    if args.compare_backends:
+        report = run_comparison(args.pages, args.iterations, args.seed, args.corpus, args.job_role)
+    else:
+        report = run(args.pages, args.iterations, args.concurrency, args.seed, args.cache, args.parallel_pages)
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(encoded + '\n')
+    else:
+        print(encoded)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    # Bounded LRU cache of JSON-serializable values. Values are kept encoded,
+    # so the memory cap is measured on the encoded size and callers always get
+    # a fresh copy back. With a path, the entries are mirrored to a SQLite
+    # table and reloaded on the next start.
+
+    def __init__(self, name, max_bytes, path=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS cache_{name} (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+            )
+            self._load()
+
+    def _load(self):
+        rows = self._db.execute(f'SELECT key, value FROM cache_{self.name} ORDER BY rowid').fetchall()
+        for key, encoded in rows:
+            self._entries[key] = encoded
+            self.size += len(encoded)
+        self._evict()
+
+    def _evict(self):
+        evicted = []
+        while self.size > self.max_bytes and self._entries:
+            key, encoded = self._entries.popitem(last=False)
+            self.size -= len(encoded)
+            self.evictions += 1
+            evicted.append((key,))
+        if evicted and self._db is not None:
+            self._db.executemany(f'DELETE FROM cache_{self.name} WHERE key = ?', evicted)
+
+    def get(self, key):
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(encoded)
+
+    def put(self, key, value):
+        encoded = json.dumps(value)
+        if len(encoded) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = encoded
+            self.size += len(encoded)
+            if self._db is not None:
+                self._db.execute(
+                    f'INSERT OR REPLACE INTO cache_{self.name} (key, value) VALUES (?, ?)',
+                    (key, encoded)
+                )
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            if self._db is not None:
+                self._db.execute(f'DELETE FROM cache_{self.name}')
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,112 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Near-duplicate detection for resume texts. Each text is reduced to a
+# MinHash signature over word shingles, and an LSH index buckets signatures
+# by band so a lookup only compares against the few stored texts that share
+# a band, instead of every resume seen so far.
+
+MERSENNE_PRIME = (1 << 31) - 1
+WORD = re.compile(r'\w+')
+# shingles hashed per step, bounding the num_perm x block matrix
+SIGNATURE_BLOCK = 1024
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, shingle_size=5, seed=1, max_shingles=4096):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_shingles = max_shingles
+        rng = np.random.RandomState(seed)
+        # h(x) = (a * x + b) mod p on 31-bit shingle hashes stays inside uint64
+        self._a = rng.randint(1, MERSENNE_PRIME, num_perm).astype(np.uint64)[:, None]
+        self._b = rng.randint(0, MERSENNE_PRIME, num_perm).astype(np.uint64)[:, None]
+
+    def shingles(self, text):
+        # 31-bit hashes of overlapping word n-grams, so reflowed lines,
+        # changed spacing and case do not matter
+        words = WORD.findall(text.lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        k = min(self.shingle_size, len(words))
+        hashes = {
+            zlib.crc32(' '.join(words[i:i + k]).encode('utf-8')) & MERSENNE_PRIME
+            for i in range(len(words) - k + 1)
+        }
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text):
+        # None for texts without a single word
+        shingles = self.shingles(text)
+        if shingles.size == 0:
+            return None
+        if shingles.size > self.max_shingles:
+            # Long texts keep only their smallest shingle hashes. The sample
+            # is consistent, so texts sharing most shingles keep mostly the
+            # same ones and their similarity survives it.
+            shingles = np.partition(shingles, self.max_shingles - 1)[:self.max_shingles]
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, shingles.size, SIGNATURE_BLOCK):
+            block = shingles[None, start:start + SIGNATURE_BLOCK]
+            np.minimum(signature, ((self._a * block + self._b) % MERSENNE_PRIME).min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+
+class DuplicateIndex:
+    # In-process LSH index over MinHash signatures. bands * rows must equal
+    # the hasher's num_perm; 16 bands of 8 rows make pairs above about 0.7
+    # Jaccard similarity likely to share a bucket. Holds at most max_entries
+    # texts, forgetting the oldest first.
+
+    def __init__(self, threshold=0.9, num_perm=128, bands=16, max_entries=100000):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature, exclude=None):
+        # Returns (key, info, estimated similarity) for the most similar
+        # stored text at or above threshold, or None.
+        best = None
+        with self._lock:
+            candidates = set()
+            for band, band_key in enumerate(self._band_keys(signature)):
+                candidates |= self._buckets[band].get(band_key, set())
+            candidates.discard(exclude)
+            for key in candidates:
+                stored, info = self._entries[key]
+                similarity = float(np.count_nonzero(stored == signature)) / len(signature)
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (key, info, similarity)
+        return best
+
+    def add(self, key, signature, info=None):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (signature, info)
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (old_signature, _) = self._entries.popitem(last=False)
+                for band, band_key in enumerate(self._band_keys(old_signature)):
+                    bucket = self._buckets[band][band_key]
+                    bucket.discard(old_key)
+                    if not bucket:
+                        del self._buckets[band][band_key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,64 @@
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Slimmer response bodies for high-volume clients. A fields= projection
+# drops everything a client does not read, and the compact encoding sends
+# each result as an array in the order of a 'fields' header, with keyword
+# and skill lists as indices into the role's term lists (GET /roles/<id>,
+# matched by the role-set version) instead of repeated strings.
+
+FORMATS = ('json', 'compact', 'msgpack')
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+
+# result keys holding role terms, and the Role attribute they index into
+TERM_FIELDS = {
+    'found_keywords': 'keywords',
+    'missing_keywords': 'keywords',
+    'found_skills': 'skills',
+    'missing_skills': 'skills'
+}
+
+
+def parse_fields(value, allowed):
+    # Returns (list of field names or None for all, None) or (None, message)
+    if not value:
+        return None, None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        return None, f"Unknown field: {', '.join(unknown)}"
+    return fields, None
+
+
+def project(result, fields):
+    if fields is None:
+        return result
+    return {field: result[field] for field in fields if field in result}
+
+
+def compact_rows(results, fields, role=None):
+    # One list of values per result in fields order, missing ones as None.
+    # Term lists become indices when the results belong to a single role.
+    positions = {}
+    if role is not None:
+        for field in fields:
+            if field in TERM_FIELDS:
+                positions[field] = {}
+                for position, term in enumerate(getattr(role, TERM_FIELDS[field])):
+                    positions[field].setdefault(term, position)
+    rows = []
+    for result in results:
+        row = []
+        for field in fields:
+            value = result.get(field)
+            if value is not None and field in positions:
+                value = [positions[field][term] for term in value]
+            row.append(value)
+        rows.append(row)
+    return rows
+
+
+def pack(payload):
+    return msgpack.packb(payload, use_bin_type=True)
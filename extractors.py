@@ -0,0 +1,228 @@
+import importlib
+import importlib.util
+import mmap
+import os
+import threading
+import zipfile
+from xml.etree import ElementTree
+
+# Text extraction backends. PDFs go through the fastest extractor that is
+# installed, falling back to PyPDF2, which is always there; pypdf and
+# pdfminer.six can be chosen by name. DOCX and plain text uploads have
+# standard-library readers. Every backend exposes a
+# document as a sequence of pages, so page caps, metrics, streaming and
+# parallel extraction in app.py work the same way for all of them.
+
+DOCUMENT_TYPES = {'.pdf': 'pdf', '.docx': 'docx', '.txt': 'txt'}
+
+# word/document.xml or a text file larger than this is not a resume
+MAX_DOCUMENT_TEXT_BYTES = 16 * 1024 * 1024
+
+
+def document_type(filename):
+    # 'pdf', 'docx', 'txt' or None for anything else
+    return DOCUMENT_TYPES.get(os.path.splitext(filename or '')[1].lower())
+
+
+class Document:
+    # An opened upload: the backend that reads it, the backend's own handle,
+    # and the path or stream it was opened from.
+    __slots__ = ('backend', 'handle', 'page_count', 'source')
+
+    def __init__(self, backend, handle, source=None):
+        self.backend = backend
+        self.handle = handle
+        self.page_count = backend.page_count(handle)
+        self.source = source
+
+    def pages(self, start, stop):
+        return self.backend.pages(self.handle, start, stop)
+
+
+class PyPDF2Backend:
+    name = 'pypdf2'
+    module = 'PyPDF2'
+    _available = None
+
+    def available(self):
+        if self._available is None:
+            self._available = importlib.util.find_spec(self.module) is not None
+        return self._available
+
+    def open(self, stream):
+        reader = importlib.import_module(self.module).PdfReader(stream)
+        if reader.is_encrypted:
+            reader.decrypt('')
+        return reader
+
+    def open_file(self, path):
+        # Memory-mapped, so processes extracting from the same file share
+        # its pages instead of each reading a copy
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.open(buffer)
+
+    def page_count(self, handle):
+        return len(handle.pages)
+
+    def pages(self, handle, start, stop):
+        for number in range(start, stop):
+            yield handle.pages[number].extract_text() or ''
+
+
+class PypdfBackend(PyPDF2Backend):
+    # PyPDF2's maintained successor, with a much faster text extractor
+    name = 'pypdf'
+    module = 'pypdf'
+
+
+class PdfminerBackend(PyPDF2Backend):
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def open(self, stream):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        return list(PDFPage.create_pages(PDFDocument(PDFParser(stream))))
+
+    def page_count(self, handle):
+        return len(handle)
+
+    def pages(self, handle, start, stop):
+        from io import StringIO
+
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+
+        # boxes_flow=None skips ordering text boxes by reading flow, the
+        # costly part of layout analysis. Characters are still grouped into
+        # lines; with no layout at all (laparams=None) words at the end and
+        # start of consecutive lines run together.
+        output = StringIO()
+        manager = PDFResourceManager()
+        device = TextConverter(manager, output, laparams=LAParams(boxes_flow=None))
+        interpreter = PDFPageInterpreter(manager, device)
+        try:
+            for page in handle[start:stop]:
+                interpreter.process_page(page)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        finally:
+            device.close()
+
+
+class PdfiumBackend(PyPDF2Backend):
+    # Chrome's PDF engine. PDFium is not thread-safe, so calls into it are
+    # serialized within a process; PyPDF2 holds the GIL anyway.
+    name = 'pypdfium2'
+    module = 'pypdfium2'
+    _lock = threading.Lock()
+
+    def open(self, stream):
+        import pypdfium2
+
+        stream.seek(0)
+        with self._lock:
+            return pypdfium2.PdfDocument(stream.read())
+
+    def open_file(self, path):
+        import pypdfium2
+
+        with self._lock:
+            return pypdfium2.PdfDocument(path)
+
+    def page_count(self, handle):
+        return len(handle)
+
+    def pages(self, handle, start, stop):
+        for number in range(start, stop):
+            with self._lock:
+                page = handle[number]
+                text_page = page.get_textpage()
+                text = text_page.get_text_range()
+                text_page.close()
+                page.close()
+            yield text.replace('\r\n', '\n')
+
+
+class DocxBackend:
+    # Reads the paragraphs of word/document.xml directly; explicit page
+    # breaks split pages, otherwise the document is a single page.
+    name = 'docx'
+    NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+    def available(self):
+        return True
+
+    def open(self, stream):
+        with zipfile.ZipFile(stream) as archive:
+            if archive.getinfo('word/document.xml').file_size > MAX_DOCUMENT_TEXT_BYTES:
+                raise ValueError('document.xml is too large')
+            root = ElementTree.fromstring(archive.read('word/document.xml'))
+        pages = [[]]
+        for paragraph in root.iter(self.NAMESPACE + 'p'):
+            parts = []
+            for element in paragraph.iter():
+                if element.tag == self.NAMESPACE + 't':
+                    parts.append(element.text or '')
+                elif element.tag == self.NAMESPACE + 'tab':
+                    parts.append('\t')
+                elif element.tag in (self.NAMESPACE + 'br', self.NAMESPACE + 'cr'):
+                    if element.get(self.NAMESPACE + 'type') == 'page':
+                        pages[-1].append(''.join(parts))
+                        pages.append([])
+                        parts = []
+                    else:
+                        parts.append('\n')
+            pages[-1].append(''.join(parts))
+        return ['\n'.join(lines) for lines in pages]
+
+    def page_count(self, handle):
+        return len(handle)
+
+    def pages(self, handle, start, stop):
+        return iter(handle[start:stop])
+
+
+class TextBackend(DocxBackend):
+    # UTF-8 (with or without a BOM), else Windows-1252; form feeds split pages
+    name = 'txt'
+
+    def open(self, stream):
+        stream.seek(0)
+        data = stream.read(MAX_DOCUMENT_TEXT_BYTES + 1)
+        if len(data) > MAX_DOCUMENT_TEXT_BYTES or b'\0' in data:
+            raise ValueError('not a text file')
+        try:
+            text = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            text = data.decode('cp1252', 'replace')
+        return text.split('\f')
+
+
+# fastest first, as measured by benchmark.py --compare-backends: PDFium,
+# then PyPDF2 3.0 (ahead of pypdf 6's layout-aware extractor), then
+# pdfminer.six. 'auto' never gets past PyPDF2.
+PDF_BACKENDS = {
+    backend.name: backend
+    for backend in (PdfiumBackend(), PyPDF2Backend(), PypdfBackend(), PdfminerBackend())
+}
+DOCUMENT_BACKENDS = {'docx': DocxBackend(), 'txt': TextBackend()}
+
+
+def available_pdf_backends():
+    return [name for name, backend in PDF_BACKENDS.items() if backend.available()]
+
+
+def pdf_backend(name='auto'):
+    # 'auto' picks the first installed backend; a named one must be installed
+    if name == 'auto':
+        name = available_pdf_backends()[0]
+    backend = PDF_BACKENDS.get(name)
+    if backend is None or not backend.available():
+        raise ValueError(f'PDF backend {name} is not available')
+    return backend
@@ -0,0 +1,227 @@
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# Background jobs for uploads that would otherwise outlive a proxy timeout.
+# Jobs and their state live in SQLite and their files in a spool directory,
+# so queued work survives a restart. Each process runs a fixed number of
+# worker threads that claim jobs with a single UPDATE, which keeps several
+# processes sharing one queue from running the same job twice.
+
+HOST = socket.gethostname()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    def __init__(self, path, spool_dir, handler, workers=2, poll_seconds=0.5,
+                 retention_seconds=86400, max_attempts=3):
+        # handler(kind, params, files) returns (result, None) or
+        # (None, error dict); files is a list of (filename, path) pairs.
+        self.spool_dir = spool_dir
+        self.handler = handler
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self.max_attempts = max_attempts
+        self.owner = f'{HOST}:{os.getpid()}'
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._next_prune = 0
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+        ''')
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def start(self):
+        # Jobs left running by a process on this host that no longer exists
+        # go back to the queue before the workers start; the workers check
+        # again every minute, for processes that died since.
+        self._requeue_orphans(own=True)
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'ats-job-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        # Lets each worker finish the job it is running, then stops it; jobs
+        # still queued stay queued for the next process that starts workers.
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind, params, files):
+        # files is a list of (filename, bytes or binary stream); they are
+        # copied into the spool directory before the job becomes visible.
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.spool_dir, job_id)
+        os.makedirs(job_dir)
+        filenames = []
+        for number, (filename, data) in enumerate(files):
+            with open(os.path.join(job_dir, str(number)), 'wb') as f:
+                if isinstance(data, bytes):
+                    f.write(data)
+                else:
+                    shutil.copyfileobj(data, f, 1024 * 1024)
+            filenames.append(filename)
+        params = dict(params, filenames=filenames)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params), time.time())
+            )
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(
+                '''SELECT id, kind, status, attempts, result, error, created_at, started_at, finished_at
+                   FROM jobs WHERE id = ?''',
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row[2] == 'queued':
+                position = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (row[6],)
+                ).fetchone()[0]
+        job = {
+            'id': row[0],
+            'kind': row[1],
+            'status': row[2],
+            'attempts': row[3],
+            'created_at': row[6],
+            'started_at': row[7],
+            'finished_at': row[8]
+        }
+        if position is not None:
+            job['queue_position'] = position
+        if row[4] is not None:
+            job['result'] = json.loads(row[4])
+        if row[5] is not None:
+            job['error'] = json.loads(row[5])
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._db.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return {status: counts.get(status, 0) for status in ('queued', 'running', 'done', 'failed')}
+
+    def _claim(self):
+        with self._lock:
+            return self._db.execute(
+                '''UPDATE jobs SET status = 'running', owner = ?, started_at = ?, attempts = attempts + 1
+                   WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1)
+                   RETURNING id, kind, params, attempts''',
+                (self.owner, time.time())
+            ).fetchone()
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._db.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?',
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    json.dumps(error) if error is not None else None,
+                    time.time(),
+                    job_id
+                )
+            )
+        shutil.rmtree(os.path.join(self.spool_dir, job_id), ignore_errors=True)
+
+    def _requeue_orphans(self, own=False):
+        # own also requeues jobs owned by this pid: at start they can only be
+        # left over from an earlier process that had the same pid
+        with self._lock:
+            rows = self._db.execute("SELECT id, owner FROM jobs WHERE status = 'running'").fetchall()
+            for job_id, owner in rows:
+                host, _, pid = (owner or '').rpartition(':')
+                if host != HOST or not pid.isdigit():
+                    continue
+                if (own and int(pid) == os.getpid()) or (int(pid) != os.getpid() and not _pid_alive(int(pid))):
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ? AND status = 'running'",
+                        (job_id,)
+                    )
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,))
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"Error claiming job: {e}")
+                job = None
+            if job is None:
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + 60
+                    try:
+                        self._requeue_orphans()
+                        self._prune()
+                    except Exception as e:
+                        print(f"Error maintaining job queue: {e}")
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self._run(*job)
+
+    def _run(self, job_id, kind, params, attempts):
+        if attempts > self.max_attempts:
+            # it keeps taking its worker process down with it
+            self._finish(job_id, 'failed', error={'error': 'Job failed repeatedly and was abandoned'})
+            return
+        params = json.loads(params)
+        job_dir = os.path.join(self.spool_dir, job_id)
+        files = [
+            (filename, os.path.join(job_dir, str(number)))
+            for number, filename in enumerate(params.pop('filenames'))
+        ]
+        try:
+            result, error = self.handler(kind, params, files)
+        except Exception as e:
+            print(f"Error running job {job_id}: {e}")
+            result, error = None, {'error': str(e)}
+        if error is not None:
+            self._finish(job_id, 'failed', error=error)
+        else:
+            self._finish(job_id, 'done', result=result)
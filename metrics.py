@@ -0,0 +1,262 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal in-process metrics rendered in the Prometheus text exposition
+# format, so /metrics needs no client library.
+#
+# Forked workers (serve.py) share their counters and histograms through a
+# directory: each process writes its own values to a file there and /metrics
+# sums the files of every process, so any worker can answer a scrape.
+# Collector gauges (cache sizes and hit counts) stay per process.
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def state(self, values=None):
+        # JSON-friendly form of snapshot() (or of the values given)
+        values = self.snapshot() if values is None else values
+        return [[list(key), value] for key, value in values.items()]
+
+    def combine(self, states):
+        values = {}
+        for state in states:
+            for key, value in state:
+                key = tuple(map(tuple, key))
+                values[key] = values.get(key, 0) + value
+        return values
+
+    def render(self, values=None):
+        values = self.snapshot() if values is None else values
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self._series.items()}
+
+    def state(self, series=None):
+        series = self.snapshot() if series is None else series
+        return [[list(key), value] for key, value in series.items()]
+
+    def combine(self, states):
+        series = {}
+        for state in states:
+            for key, (counts, total, count) in state:
+                key = tuple(map(tuple, key))
+                merged = series.get(key)
+                if merged is None:
+                    series[key] = [list(counts), total, count]
+                else:
+                    merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                    merged[1] += total
+                    merged[2] += count
+        return series
+
+    def render(self, series=None):
+        series = self.snapshot() if series is None else series
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(key + (('le', _format_value(bound)),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {count}')
+        return lines
+
+
+ARCHIVE_FILE = 'archive.json'
+# file names of retired processes kept in the archive, so a scrape that read
+# a file just before it was folded in does not count it twice
+ARCHIVE_RETIRED_NAMES = 100
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # gone (retired) since the directory was listed, or being replaced
+        return None
+
+
+def _write_json(path, data):
+    # atomically, so readers never see a partial file
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._directory = None
+        self._path = None
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        # collector() returns extra exposition lines computed at scrape time
+        self._collectors.append(collector)
+
+    def share(self, directory):
+        # Called in the parent before forking: from then on flush() writes
+        # this process's values into directory and render() sums every
+        # process's. A forked child starts from zero, as the parent's values
+        # are already in the parent's file.
+        self._directory = directory
+        os.register_at_fork(after_in_child=self._forked)
+        self.flush()
+
+    def _forked(self):
+        self._path = None
+        self._flush_lock = threading.Lock()
+        for metric in self._metrics:
+            metric.clear()
+
+    def flush(self):
+        if self._directory is None:
+            return
+        with self._flush_lock:
+            if self._path is None:
+                # unique even when the OS reuses the pid of a retired process
+                self._path = os.path.join(self._directory, f'{os.getpid()}-{time.time_ns()}.json')
+            _write_json(self._path, {metric.name: metric.state() for metric in self._metrics})
+
+    def retire(self, pid):
+        # Called by the parent when the child pid has exited: folds its file
+        # into the archive so its counts outlive it.
+        names = [name for name in os.listdir(self._directory) if name.startswith(f'{pid}-') and name.endswith('.json')]
+        if not names:
+            return
+        archive_path = os.path.join(self._directory, ARCHIVE_FILE)
+        archive = _read_json(archive_path) or {'retired': [], 'metrics': {}}
+        for name in names:
+            state = _read_json(os.path.join(self._directory, name)) or {}
+            for metric in self._metrics:
+                values = metric.combine([archive['metrics'].get(metric.name, []), state.get(metric.name, [])])
+                archive['metrics'][metric.name] = metric.state(values)
+            archive['retired'] = (archive['retired'] + [name])[-ARCHIVE_RETIRED_NAMES:]
+        _write_json(archive_path, archive)
+        for name in names:
+            os.unlink(os.path.join(self._directory, name))
+
+    def _shared_values(self):
+        self.flush()
+        # process files before the archive: one retired in between is then
+        # listed in the archive and skipped here, never missed
+        states = {}
+        for name in os.listdir(self._directory):
+            if name.endswith('.json') and name != ARCHIVE_FILE:
+                state = _read_json(os.path.join(self._directory, name))
+                if state is not None:
+                    states[name] = state
+        archive = _read_json(os.path.join(self._directory, ARCHIVE_FILE)) or {'retired': [], 'metrics': {}}
+        for name in archive['retired']:
+            states.pop(name, None)
+        states[ARCHIVE_FILE] = archive['metrics']
+        return {
+            metric.name: metric.combine(state.get(metric.name, []) for state in states.values())
+            for metric in self._metrics
+        }
+
+    def render(self):
+        shared = None if self._directory is None else self._shared_values()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(None if shared is None else shared[metric.name]))
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+def gauge_lines(name, help_text, samples, kind='gauge'):
+    # samples is a list of (labels dict, value) pairs
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+    return lines
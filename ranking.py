@@ -0,0 +1,72 @@
+import numpy as np
+
+# Vectorized BM25 / TF-IDF ranking of a pool of resumes against the role
+# vocabularies. Term counts for the whole pool form a sparse term-document
+# matrix in coordinate form; every candidate's score for every role comes out
+# of a single scatter-add over its non-zero entries.
+
+
+class RoleRanker:
+    def __init__(self, terms, role_weights):
+        # terms: vocabulary list, one matrix column per term.
+        # role_weights: {role: {term: weight}}; a role's score is the
+        # weighted sum of its terms' BM25 or TF-IDF weights.
+        self.terms = list(terms)
+        self.roles = list(role_weights)
+        self._column = {term: i for i, term in enumerate(self.terms)}
+        self._role_matrix = np.zeros((len(self.terms), len(self.roles)))
+        for j, role in enumerate(self.roles):
+            for term, weight in role_weights[role].items():
+                self._role_matrix[self._column[term], j] += weight
+
+    def term_matrix(self, term_counts):
+        # term_counts: one {term: count} dict per document. Returns the COO
+        # arrays (rows, cols, counts).
+        rows = []
+        cols = []
+        counts = []
+        for row, document_counts in enumerate(term_counts):
+            for term, count in document_counts.items():
+                column = self._column.get(term)
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+                    counts.append(count)
+        return (
+            np.array(rows, dtype=np.int64),
+            np.array(cols, dtype=np.int64),
+            np.array(counts, dtype=np.float64)
+        )
+
+    def score(self, term_counts, doc_lengths, method='bm25', k1=1.2, b=0.75):
+        # Returns an (n_documents, n_roles) array of scores.
+        n_docs = len(term_counts)
+        scores = np.zeros((n_docs, len(self.roles)))
+        if n_docs == 0:
+            return scores
+        rows, cols, tf = self.term_matrix(term_counts)
+        if tf.size == 0:
+            return scores
+
+        df = np.bincount(cols, minlength=len(self.terms))
+        if method == 'bm25':
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            lengths = np.maximum(np.asarray(doc_lengths, dtype=np.float64), 1.0)
+            norm = k1 * (1 - b + b * lengths / lengths.mean())
+            weights = idf[cols] * tf * (k1 + 1) / (tf + norm[rows])
+        elif method == 'tfidf':
+            idf = np.log((1 + n_docs) / (1 + df)) + 1
+            weights = (1 + np.log(tf)) * idf[cols]
+        else:
+            raise ValueError(f'Unknown ranking method: {method}')
+
+        np.add.at(scores, rows, weights[:, None] * self._role_matrix[cols])
+        return scores
+
+    def rank(self, term_counts, doc_lengths, role, method='bm25'):
+        # Returns [(document index, score, score relative to the best)], best first.
+        column = self.roles.index(role)
+        scores = self.score(term_counts, doc_lengths, method)[:, column]
+        order = np.argsort(-scores, kind='stable')
+        best = scores[order[0]] if len(order) and scores[order[0]] > 0 else 1.0
+        return [(int(i), float(scores[i]), float(scores[i] / best * 100)) for i in order]
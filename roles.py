@@ -0,0 +1,363 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+LOAD_ERRORS = (OSError, ValueError) + ((yaml.YAMLError,) if yaml is not None else ())
+
+# Role definitions live as one JSON (or, with PyYAML installed, YAML) file per
+# role; the file name without extension is the role key. They are compiled
+# into immutable Role objects grouped in a RoleSet snapshot, and RoleRegistry
+# swaps in a new snapshot when the files change. Requests take one snapshot
+# up front and use it throughout, so a reload never changes the roles under
+# a request that is already running.
+
+CATEGORY_WEIGHTS = (('keywords', 0.35), ('skills', 0.25), ('experience', 0.20))
+
+
+def _trie_regex(node):
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if '' in node:
+        # a term may end here, but only on a word boundary
+        branches.append(r'(?!\w)')
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+class TermMatcher:
+    # Finds every term of a vocabulary in one pass over lowercased text, with
+    # word-boundary semantics so that 'r' no longer matches inside 'docker'.
+    def __init__(self, terms):
+        self.terms = sorted({term.lower() for term in terms})
+        trie = {}
+        for term in self.terms:
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[''] = True
+        self._pattern = re.compile(r'(?<!\w)(?=(' + _trie_regex(trie) + '))') if self.terms else None
+        # The scan reports the longest term starting at each position, so a
+        # match also accounts for the shorter terms nested inside it. The
+        # plain substring test rules out almost every pair before the regex.
+        self._implied = {
+            term: frozenset(
+                other for other in self.terms
+                if other != term and other in term
+                and re.search(r'(?<!\w)' + re.escape(other) + r'(?!\w)', term)
+            )
+            for term in self.terms
+        }
+        # Terms that share a start position with a longer match; other nested
+        # terms are reported at their own positions.
+        self._prefixes = {
+            term: (term,) + tuple(
+                other for other in self._implied[term]
+                if re.match(re.escape(other) + r'(?!\w)', term)
+            )
+            for term in self.terms
+        }
+
+    def find(self, text_lower, start=0):
+        # Matches begin at or after start; text before it still counts for
+        # the word-boundary check.
+        found = set()
+        if self._pattern is None:
+            return found
+        for match in self._pattern.finditer(text_lower, start):
+            term = match.group(1)
+            if term not in found:
+                found.add(term)
+                found |= self._implied[term]
+                if len(found) == len(self.terms):
+                    break
+        return found
+
+    def count(self, text_lower):
+        # Occurrences of every term, for frequency-weighted ranking.
+        counts = {}
+        if self._pattern is None:
+            return counts
+        for match in self._pattern.finditer(text_lower):
+            for term in self._prefixes[match.group(1)]:
+                counts[term] = counts.get(term, 0) + 1
+        return counts
+
+
+class Role:
+    __slots__ = (
+        'key', 'name', 'order',
+        'keywords', 'skills', 'experience',
+        'keyword_terms', 'skill_terms', 'experience_terms',
+        'keyword_total', 'skill_total', 'experience_total',
+        'matcher'
+    )
+
+    def __init__(self, key, definition):
+        _validate(key, definition)
+        values = {
+            'key': key,
+            'name': definition['name'],
+            'order': definition.get('order', 1000),
+            'keywords': tuple(definition['keywords']),
+            'skills': tuple(definition['skills']),
+            'experience': tuple(definition['experience'])
+        }
+        for category, prefix in (('keywords', 'keyword'), ('skills', 'skill'), ('experience', 'experience')):
+            values[f'{prefix}_terms'] = tuple(term.lower() for term in values[category])
+            values[f'{prefix}_total'] = float(len(values[category]))
+        values['matcher'] = TermMatcher(values['keywords'] + values['skills'] + values['experience'])
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Role objects are immutable')
+
+    def ranking_weights(self):
+        # Same category weights as analyze_resume, spread over each category's terms.
+        weights = {}
+        for category, category_weight in CATEGORY_WEIGHTS:
+            for term in getattr(self, category):
+                term = term.lower()
+                weights[term] = weights.get(term, 0) + category_weight / len(getattr(self, category))
+        return weights
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'keywords': list(self.keywords),
+            'skills': list(self.skills),
+            'experience': list(self.experience)
+        }
+
+
+class RoleSet:
+    # An immutable snapshot of every role plus the structures compiled from
+    # their combined vocabulary.
+    __slots__ = ('roles', 'version', 'matcher', '_ranker')
+
+    def __init__(self, definitions):
+        roles = sorted(
+            (Role(key, definition) for key, definition in definitions.items()),
+            key=lambda role: (role.order, role.key)
+        )
+        if not roles:
+            raise ValueError('No role definitions found')
+        object.__setattr__(self, 'roles', {role.key: role for role in roles})
+        # content hash, so cached results are tied to the definitions they used
+        encoded = json.dumps(definitions, sort_keys=True).encode('utf-8')
+        object.__setattr__(self, 'version', hashlib.sha256(encoded).hexdigest()[:12])
+        object.__setattr__(self, 'matcher', TermMatcher(
+            [term for role in roles for term in role.matcher.terms]
+        ))
+        object.__setattr__(self, '_ranker', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('RoleSet objects are immutable')
+
+    @property
+    def ranker(self):
+        # Built on first use, so numpy is only imported once pool ranking runs.
+        if self._ranker is None:
+            from ranking import RoleRanker
+            object.__setattr__(self, '_ranker', RoleRanker(
+                self.matcher.terms, {role.key: role.ranking_weights() for role in self}
+            ))
+        return self._ranker
+
+    def __contains__(self, key):
+        return key in self.roles
+
+    def __getitem__(self, key):
+        return self.roles[key]
+
+    def __iter__(self):
+        return iter(self.roles.values())
+
+
+class RoleSetCache:
+    # Compiled single-role RoleSets for ad-hoc roles, keyed by role id, with
+    # the least recently used evicted once max_entries is reached.
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            role_set = self._entries.get(key)
+            if role_set is not None:
+                self._entries.move_to_end(key)
+            return role_set
+
+    def put(self, key, role_set):
+        with self._lock:
+            self._entries[key] = role_set
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Job description parsing. Terms already in the role vocabulary keep the
+# category they have in the role files; other technical-looking tokens
+# (PySpark, AWS, C++, Node.js, S3) become keywords.
+TECH_TOKEN = re.compile(r'(?<![\w.+#/-])[A-Za-z][\w.+#/-]*[\w+#]|(?<![\w.+#/-])[A-Za-z]')
+NOT_TECH = frozenset({
+    'us', 'usa', 'uk', 'eu', 'eeo', 'eoe', 'hr', 'pto', 'ceo', 'cto', 'cfo', 'vp', 'ii', 'iii', 'iv',
+    'phd', 'ms', 'bs', 'ba', 'msc', 'bsc', 'mba', 'e.g', 'i.e', 'u.s', 'etc', 'or', 'and', 'we', 'you'
+})
+
+
+def _is_tech_token(token):
+    if len(token) > 30 or all(part in NOT_TECH for part in token.lower().split('/')):
+        return False
+    return (
+        any(ch in token for ch in '+#') or
+        any(ch.isdigit() for ch in token) or
+        ('.' in token and not token.endswith('.')) or
+        any(ch.isupper() for ch in token[1:])
+    )
+
+
+def definition_from_description(description, roles, name=None, extra=None, max_extra_terms=15):
+    # Builds a role definition with the usual keywords/skills/experience
+    # shape from a job description. extra may supply more terms per
+    # category. Categories the description says nothing about are taken
+    # from the preset role it overlaps most. Raises ValueError when nothing
+    # usable is found.
+    description_lower = description.lower()
+    found = roles.matcher.find(description_lower)
+
+    categories = {category: [] for category, _ in CATEGORY_WEIGHTS}
+    overlap = Counter()
+    placements = {}
+    for role in roles:
+        for category, _ in CATEGORY_WEIGHTS:
+            for term in getattr(role, category):
+                if term.lower() in found:
+                    overlap[role.key] += 1
+                    placements.setdefault(term.lower(), Counter())[(category, term)] += 1
+    order = [category for category, _ in CATEGORY_WEIGHTS]
+    for term in sorted(placements, key=description_lower.find):
+        # the most common placement; ties go to the heavier category
+        (category, original), _ = max(
+            placements[term].items(), key=lambda item: (item[1], -order.index(item[0][0]))
+        )
+        categories[category].append(original)
+
+    tokens = Counter()
+    for token in TECH_TOKEN.findall(description):
+        if _is_tech_token(token) and token.lower() not in found:
+            tokens[token.lower()] += 1
+    categories['keywords'].extend(
+        sorted(tokens, key=lambda token: (-tokens[token], description_lower.find(token)))[:max_extra_terms]
+    )
+
+    for category, terms in (extra or {}).items():
+        known = {term.lower() for term in categories[category]}
+        categories[category].extend(term for term in terms if term.lower() not in known)
+
+    if not any(categories.values()):
+        raise ValueError('No key phrases found in the job description')
+    closest = roles[max(overlap, key=overlap.get)] if overlap else next(iter(roles))
+    for category, terms in categories.items():
+        if not terms:
+            terms.extend(getattr(closest, category))
+
+    definition = dict(categories)
+    definition['name'] = name or f'Custom role (closest to {closest.name})'
+    return definition
+
+
+def adhoc_role_id(definition):
+    encoded = json.dumps(definition, sort_keys=True).encode('utf-8')
+    return 'jd-' + hashlib.sha256(encoded).hexdigest()[:12]
+
+
+def _validate(key, definition):
+    if not isinstance(definition, dict):
+        raise ValueError(f'{key}: role definition must be a mapping')
+    if not isinstance(definition.get('name'), str) or not definition['name']:
+        raise ValueError(f'{key}: name must be a non-empty string')
+    for category, _ in CATEGORY_WEIGHTS:
+        terms = definition.get(category)
+        if not isinstance(terms, list) or not terms or not all(isinstance(t, str) and t.strip() for t in terms):
+            raise ValueError(f'{key}: {category} must be a non-empty list of strings')
+
+
+def _role_files(directory):
+    extensions = ('.json', '.yaml', '.yml') if yaml is not None else ('.json',)
+    entries = [
+        entry for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.endswith(extensions)
+    ]
+    return sorted(entries, key=lambda entry: entry.name)
+
+
+def load_role_definitions(directory):
+    definitions = {}
+    for entry in _role_files(directory):
+        key = os.path.splitext(entry.name)[0]
+        with open(entry.path, encoding='utf-8') as f:
+            if entry.name.endswith('.json'):
+                definitions[key] = json.load(f)
+            else:
+                definitions[key] = yaml.safe_load(f)
+    return definitions
+
+
+def _directory_signature(directory):
+    return tuple(
+        (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+        for entry in _role_files(directory)
+    )
+
+
+class RoleRegistry:
+    # Holds the current RoleSet. get() re-checks the directory at most every
+    # poll_seconds and, when a file changed, compiles a new snapshot and swaps
+    # it in with a single assignment. A broken edit is reported and the old
+    # snapshot stays in place.
+
+    def __init__(self, directory, poll_seconds=2.0):
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self._signature = _directory_signature(directory)
+        self.current = RoleSet(load_role_definitions(directory))
+        self._next_check = time.monotonic() + poll_seconds
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self.poll_seconds and time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._next_check = time.monotonic() + self.poll_seconds
+                self.reload()
+            finally:
+                self._lock.release()
+        return self.current
+
+    def reload(self, force=False):
+        try:
+            signature = _directory_signature(self.directory)
+            if signature == self._signature and not force:
+                return False
+            role_set = RoleSet(load_role_definitions(self.directory))
+        except LOAD_ERRORS as e:
+            print(f"Error reloading role definitions: {e}")
+            return False
+        self._signature = signature
+        self.current = role_set
+        print(f"Loaded {len(role_set.roles)} role definitions (version {role_set.version})")
+        return True
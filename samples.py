@@ -0,0 +1,70 @@
+# Synthetic resume PDFs, for the benchmark's corpus and the warm-up that
+# serve.py runs before forking workers.
+
+FILLER = (
+    'responsible for delivering results across teams and stakeholders while '
+    'maintaining quality and meeting deadlines in a fast paced environment'
+).split()
+
+SECTION_HEADINGS = ['Summary', 'Experience', 'Education', 'Skills', 'Projects']
+
+
+def build_pdf(pages):
+    # Minimal single-font PDF writer; each page is a list of text lines.
+    objects = [b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    pages_id = 2 * len(pages) + 2
+    page_ids = []
+    for lines in pages:
+        ops = ['BT /F1 10 Tf 40 800 Td 12 TL']
+        for line in lines:
+            line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            ops.append(f'({line}) Tj T*')
+        ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 842] '
+            b'/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>' % (pages_id, len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    objects.append(b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids)))
+    objects.append(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, len(objects), xref
+    )
+    return bytes(out)
+
+
+def synthetic_resume(rng, role, page_count, lines_per_page=60):
+    # A resume PDF with the contact lines, section headings and a random
+    # share of role's terms that analysis looks for
+    terms = role.keywords + role.skills + role.experience
+    header = [
+        'Jordan Candidate',
+        f'jordan.{rng.randrange(10 ** 6)}@example.com  +1 555-{rng.randrange(100, 999)}-{rng.randrange(1000, 9999)}',
+        'linkedin.com/in/jordan  github.com/jordan'
+    ]
+    pages = []
+    for page_number in range(page_count):
+        lines = list(header) if page_number == 0 else []
+        while len(lines) < lines_per_page:
+            if rng.random() < 0.1:
+                lines.append(rng.choice(SECTION_HEADINGS))
+                continue
+            words = rng.sample(FILLER, 8)
+            for _ in range(rng.randrange(3)):
+                words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+            lines.append(' '.join(words))
+        pages.append(lines)
+    return build_pdf(pages)
@@ -0,0 +1,176 @@
+import argparse
+import gc
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from werkzeug.serving import BaseWSGIServer
+
+import app as ats
+from samples import synthetic_resume
+
+# Pre-forking production launcher.
+#
+#   python serve.py --port 8000 --max-requests 1000
+#
+# The parent loads the role definitions, compiles the matchers and runs the
+# warm-up before forking, so every worker starts hot and shares that memory
+# copy-on-write. Each worker serves one request at a time from the shared
+# listening socket and exits after --max-requests (plus a random jitter, so
+# workers do not all restart together), which bounds PyPDF2 memory growth;
+# the parent forks a replacement. SIGTERM or SIGINT stops all workers.
+#
+# Background jobs run in one more process of their own with --jobs (the HTTP
+# workers only submit and report them), which finishes its running jobs
+# before it exits. The CPU cores are shared out between the workers'
+# extraction pools rather than each worker starting one per core. The
+# workers pool their request metrics in a temporary directory, so /metrics
+# reports all of them whichever worker answers.
+
+
+def available_cores():
+    # respects CPU affinity and container cpusets where the OS exposes them
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class WorkerServer(BaseWSGIServer):
+    handled = 0
+
+    def process_request(self, request, client_address):
+        self.handled += 1
+        super().process_request(request, client_address)
+
+
+def run_worker(listener, host, port, max_requests):
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    server = WorkerServer(host, port, ats.app, fd=listener.fileno())
+    # wake up regularly to notice SIGTERM between requests
+    server.timeout = 1
+    while not stopping and server.handled < max_requests:
+        server.handle_request()
+    server.server_close()
+    ats.stop_job_queue()
+
+
+def run_jobs():
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ats.app.config['JOB_RUN_WORKERS'] = True
+    ats.get_job_queue()
+    while not stopping:
+        time.sleep(1)
+        ats.METRICS.flush()
+    ats.stop_job_queue()
+    ats.METRICS.flush()
+
+
+def fork(target, *args):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            target(*args)
+        except Exception as e:
+            print(f"Worker {os.getpid()} failed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def spawn(listener, args, workers):
+    max_requests = args.max_requests + random.randint(0, args.max_requests_jitter)
+    workers.add(fork(run_worker, listener, args.host, args.port, max_requests))
+
+
+def serve(args):
+    listener = socket.create_server((args.host, args.port), backlog=args.backlog)
+    listener.set_inheritable(True)
+
+    config = ats.app.config
+    config['JOB_RUN_WORKERS'] = False
+    config['BATCH_WORKERS'] = max(1, config['BATCH_WORKERS'] // args.workers)
+
+    rng = random.Random(0)
+    ats.warm_up([synthetic_resume(rng, role, 2) for role in ats.get_roles()])
+    metrics_dir = tempfile.mkdtemp(prefix='ats-metrics-')
+    ats.METRICS.share(metrics_dir)
+    # Move everything built so far out of the collector's reach, so
+    # collections in the workers do not write to (and copy) shared pages.
+    gc.collect()
+    gc.freeze()
+
+    workers = set()
+    jobs = set()
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in workers | jobs:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Starting ATS Analyzer on http://{args.host}:{args.port} with {args.workers} workers")
+    for _ in range(args.workers):
+        spawn(listener, args, workers)
+    if args.jobs:
+        jobs.add(fork(run_jobs))
+
+    while workers or jobs:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if not stopping and os.waitstatus_to_exitcode(status) != 0:
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}")
+        ats.METRICS.retire(pid)
+        if pid in jobs:
+            jobs.discard(pid)
+            if not stopping:
+                jobs.add(fork(run_jobs))
+        else:
+            workers.discard(pid)
+            if not stopping:
+                spawn(listener, args, workers)
+    listener.close()
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    config = ats.app.config
+    parser = argparse.ArgumentParser(description='Run the ATS Analyzer with pre-forked workers.')
+    parser.add_argument('--host', default=config['SERVER_HOST'], help='address to listen on')
+    parser.add_argument('--port', type=int, default=config['SERVER_PORT'], help='port to listen on')
+    parser.add_argument('--workers', type=int, default=config['SERVER_WORKERS'] or available_cores(),
+                        help='worker processes (default: available cores)')
+    parser.add_argument('--max-requests', type=int, default=config['SERVER_MAX_REQUESTS'],
+                        help='requests a worker serves before it is replaced')
+    parser.add_argument('--max-requests-jitter', type=int, default=config['SERVER_MAX_REQUESTS_JITTER'],
+                        help='random extra requests per worker, to stagger restarts')
+    parser.add_argument('--backlog', type=int, default=2048, help='listen backlog')
+    parser.add_argument('--jobs', action='store_true', help='run background jobs, in a process of their own')
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, 'fork'):
+        sys.exit('serve.py needs os.fork; use asgi.py on this platform')
+    serve(args)
+
+
+if __name__ == '__main__':
+    main()
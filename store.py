@@ -0,0 +1,141 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class CandidateStore:
+    # Analyzed resumes kept in SQLite. The raw text and the role vocabulary terms
+    # found in it are indexed with FTS5, which maintains its inverted index
+    # incrementally on every insert, so searches stay fast as the pool grows.
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS candidates (
+                id INTEGER PRIMARY KEY,
+                digest TEXT NOT NULL UNIQUE,
+                filename TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS analyses (
+                candidate_id INTEGER NOT NULL REFERENCES candidates(id),
+                job_role TEXT NOT NULL,
+                overall_score INTEGER NOT NULL,
+                result TEXT,
+                analyzed_at REAL NOT NULL,
+                PRIMARY KEY (candidate_id, job_role)
+            );
+            CREATE INDEX IF NOT EXISTS analyses_role_score ON analyses (job_role, overall_score);
+            CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+                terms, text, tokenize = 'unicode61 remove_diacritics 2'
+            );
+        ''')
+
+    def has_candidate(self, digest):
+        with self._lock:
+            row = self._db.execute('SELECT 1 FROM candidates WHERE digest = ?', (digest,)).fetchone()
+        return row is not None
+
+    def add_candidate(self, digest, filename, text, terms):
+        # terms is the list of vocabulary terms found in text
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                row = self._db.execute('SELECT id FROM candidates WHERE digest = ?', (digest,)).fetchone()
+                if row is None:
+                    candidate_id = self._db.execute(
+                        'INSERT INTO candidates (digest, filename, created_at) VALUES (?, ?, ?)',
+                        (digest, filename, time.time())
+                    ).lastrowid
+                    self._db.execute(
+                        'INSERT INTO candidates_fts (rowid, terms, text) VALUES (?, ?, ?)',
+                        (candidate_id, ' ; '.join(terms), text)
+                    )
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def add_analyses(self, digest, analyses):
+        # analyses maps job_role to (overall_score, full result or None)
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                '''INSERT INTO analyses (candidate_id, job_role, overall_score, result, analyzed_at)
+                   SELECT id, ?, ?, ?, ? FROM candidates WHERE digest = ?
+                   ON CONFLICT (candidate_id, job_role) DO UPDATE SET
+                       overall_score = excluded.overall_score,
+                       result = COALESCE(excluded.result, analyses.result),
+                       analyzed_at = excluded.analyzed_at''',
+                [
+                    (job_role, score, json.dumps(result) if result is not None else None, now, digest)
+                    for job_role, (score, result) in analyses.items()
+                ]
+            )
+
+    def search(self, query, ranked=True, job_role=None, limit=20, offset=0):
+        # query uses FTS5 syntax: AND/OR/NOT, "quoted phrases", terms:column
+        # filters. Ranked searches order by BM25; otherwise newest first, or
+        # by the stored score for job_role when one is given.
+        sql = '''
+            SELECT c.id, c.digest, c.filename, c.created_at, bm25(candidates_fts) AS rank,
+                   snippet(candidates_fts, 1, '[', ']', '...', 12) AS snippet{score_column}
+            FROM candidates_fts
+            JOIN candidates c ON c.id = candidates_fts.rowid
+            {score_join}
+            WHERE candidates_fts MATCH ?
+            ORDER BY {order}
+            LIMIT ? OFFSET ?
+        '''
+        params = [query, limit, offset]
+        if job_role:
+            score_column = ', a.overall_score'
+            score_join = 'JOIN analyses a ON a.candidate_id = c.id AND a.job_role = ?'
+            params.insert(0, job_role)
+        else:
+            score_column = score_join = ''
+        if ranked:
+            order = 'rank'
+        elif job_role:
+            order = 'a.overall_score DESC, c.id DESC'
+        else:
+            order = 'c.id DESC'
+
+        with self._lock:
+            rows = self._db.execute(
+                sql.format(score_column=score_column, score_join=score_join, order=order), params
+            ).fetchall()
+            scores = self._scores([row[0] for row in rows])
+
+        return [
+            {
+                'id': row[0],
+                'digest': row[1],
+                'filename': row[2],
+                'created_at': row[3],
+                'rank': round(-row[4], 4),
+                'snippet': row[5],
+                'scores': scores.get(row[0], {})
+            }
+            for row in rows
+        ]
+
+    def _scores(self, candidate_ids):
+        if not candidate_ids:
+            return {}
+        placeholders = ','.join('?' * len(candidate_ids))
+        scores = {}
+        for candidate_id, job_role, score in self._db.execute(
+            f'SELECT candidate_id, job_role, overall_score FROM analyses WHERE candidate_id IN ({placeholders})',
+            candidate_ids
+        ):
+            scores.setdefault(candidate_id, {})[job_role] = score
+        return scores
+
+    def count(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
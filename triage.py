@@ -0,0 +1,89 @@
+import re
+
+import PyPDF2
+
+# Cheap pre-flight check run before text extraction. PdfReader only parses
+# the xref table and trailer up front, so the page count comes from the
+# page tree root and just the first few pages' content streams are decoded
+# and scanned for text-showing operators. Scanned, encrypted and very long
+# documents are turned away without walking the whole file.
+
+# a string or array operand followed by Tj, TJ, ' or "
+TEXT_OPERATOR = re.compile(rb'[)\]>]\s*(?:Tj|TJ|\'|")')
+INLINE_IMAGE = re.compile(rb'(?<![A-Za-z])BI\s*/')
+
+
+def _first_pages(node, limit, resources=None, found=None):
+    # Walks the page tree depth first and stops after limit leaf pages, so
+    # the rest of the tree is never resolved. Returns (page, resources) pairs
+    # with inherited /Resources filled in.
+    if found is None:
+        found = []
+    resources = node.get('/Resources', resources)
+    if '/Kids' not in node:
+        found.append((node, resources))
+        return found
+    for kid in node['/Kids']:
+        if len(found) >= limit:
+            break
+        _first_pages(kid.get_object(), limit, resources, found)
+    return found
+
+
+def _stream_data(contents):
+    if contents is None:
+        return b''
+    contents = contents.get_object()
+    if isinstance(contents, PyPDF2.generic.ArrayObject):
+        return b'\n'.join(part.get_object().get_data() for part in contents)
+    return contents.get_data()
+
+
+def _scan_page(page, resources):
+    # Returns (has text operators, has images)
+    data = _stream_data(page.get('/Contents'))
+    if TEXT_OPERATOR.search(data):
+        return True, False
+    has_images = bool(INLINE_IMAGE.search(data))
+    resources = resources.get_object() if resources is not None else {}
+    xobjects = resources.get('/XObject')
+    for xobject in (xobjects.get_object().values() if xobjects is not None else ()):
+        xobject = xobject.get_object()
+        subtype = xobject.get('/Subtype')
+        if subtype == '/Image':
+            has_images = True
+        elif subtype == '/Form' and TEXT_OPERATOR.search(xobject.get_data()):
+            return True, has_images
+    return False, has_images
+
+
+def triage_pdf(source, max_pages, sample_pages=3):
+    # Returns (PdfReader, None) when the document is worth extracting, or
+    # (None, reason) with reason one of 'unreadable', 'encrypted',
+    # 'too_many_pages', 'image_only' or 'no_text'. The reader can be handed
+    # straight to extraction so the xref is not parsed twice.
+    try:
+        reader = PyPDF2.PdfReader(source)
+        if reader.is_encrypted:
+            try:
+                if not reader.decrypt(''):
+                    return None, 'encrypted'
+            except Exception:
+                # unsupported algorithm or a missing crypto dependency
+                return None, 'encrypted'
+        page_tree = reader.trailer['/Root']['/Pages']
+        page_count = int(page_tree.get('/Count', 0))
+        if page_count > max_pages:
+            return None, 'too_many_pages'
+
+        has_images = False
+        for page, resources in _first_pages(page_tree, sample_pages):
+            page_text, page_images = _scan_page(page, resources)
+            if page_text:
+                return reader, None
+            has_images = has_images or page_images
+    except Exception as e:
+        print(f"Error reading PDF structure: {e}")
+        return None, 'unreadable'
+
+    return None, 'image_only' if has_images else 'no_text'
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+import uuid
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Chunked, resumable uploads for files too large (or clients too slow) for
+# a single request. Each upload is a directory under the spool holding a
+# meta.json and a data file that chunks are only ever appended to, so the
+# upload's offset is simply the data file's size and a client that lost
+# its connection asks for it and carries on from there. The SHA-256 is
+# updated as chunks arrive, and resumes inside a zip bundle are handed to
+# member_handler as soon as their last byte is in.
+
+UPLOAD_ID = re.compile(r'[0-9a-f]{32}$')
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+LOCAL_HEADER_SIGNATURE = 0x04034b50
+
+
+class ZipScanner:
+    # Walks a zip archive's local file headers as the archive grows, instead
+    # of waiting for the central directory at its end. Gives up (leaving the
+    # rest to zipfile at commit) on members whose size is only known after
+    # their data, such as those written by streaming zip tools or ZIP64.
+
+    def __init__(self, max_member_size, extensions=('.pdf',)):
+        self.max_member_size = max_member_size
+        self.extensions = extensions
+        self.position = 0
+        self.done = False
+
+    def scan(self, f, size):
+        # Yields (name, bytes) for every complete, readable member named with
+        # one of the extensions that ends at or before size; f is the archive
+        # opened for reading.
+        while not self.done and self.position + LOCAL_HEADER.size <= size:
+            f.seek(self.position)
+            (signature, _, flags, method, _, _, crc, compressed_size, file_size,
+             name_length, extra_length) = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+            if signature != LOCAL_HEADER_SIGNATURE or flags & 0x08 or 0xFFFFFFFF in (compressed_size, file_size):
+                self.done = True
+                return
+            end = self.position + LOCAL_HEADER.size + name_length + extra_length + compressed_size
+            if end > size:
+                return
+            name = f.read(name_length).decode('utf-8' if flags & 0x800 else 'cp437', 'replace')
+            f.seek(extra_length, os.SEEK_CUR)
+            self.position = end
+            if (not name.lower().endswith(self.extensions) or flags & 0x01 or method not in (0, 8)
+                    or file_size > self.max_member_size):
+                continue
+            data = f.read(compressed_size)
+            if method == 8:
+                try:
+                    data = zlib.decompressobj(-15).decompress(data, file_size + 1)
+                except zlib.error:
+                    continue
+            if len(data) == file_size and zlib.crc32(data) == crc:
+                yield name, data
+
+
+class _UploadState:
+    __slots__ = ('offset', 'hasher', 'scanner')
+
+    def __init__(self, offset, hasher, scanner):
+        self.offset = offset
+        self.hasher = hasher
+        self.scanner = scanner
+
+
+class UploadStore:
+    def __init__(self, directory, max_size, retention_seconds=86400, member_handler=None,
+                 member_extensions=('.pdf',), delete_handler=None):
+        # member_handler(upload_id, name, data) is called for each member of
+        # a .zip upload named with one of member_extensions once it has
+        # fully arrived; returning False stops the scan for that upload.
+        # delete_handler(upload_id) is called whenever an upload is deleted,
+        # including when it expires.
+        self.directory = directory
+        self.max_size = max_size
+        self.retention_seconds = retention_seconds
+        self.member_handler = member_handler
+        self.member_extensions = member_extensions
+        self.delete_handler = delete_handler
+        self._states = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, upload_id, name=''):
+        if not UPLOAD_ID.match(upload_id):
+            return None
+        return os.path.join(self.directory, upload_id, name)
+
+    def create(self, filename, size=None):
+        self.prune()
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._path(upload_id))
+        open(self._path(upload_id, 'data'), 'wb').close()
+        with open(self._path(upload_id, 'meta.json'), 'w') as f:
+            json.dump({'filename': filename, 'size': size, 'created_at': time.time()}, f)
+        return upload_id
+
+    def info(self, upload_id):
+        # None for unknown (or expired) uploads
+        path = self._path(upload_id)
+        if path is None:
+            return None
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            offset = os.path.getsize(os.path.join(path, 'data'))
+        except (OSError, ValueError):
+            return None
+        return dict(meta, id=upload_id, offset=offset, complete=offset == meta['size'])
+
+    def _acquire(self, upload_id):
+        # Non-blocking per-upload lock that also holds across processes
+        # sharing the spool; returns a release function or None when busy.
+        # POSIX record locks (unlike flock) are not inherited by processes
+        # forked while one is held, such as the extraction pool's workers,
+        # but they do not exclude threads of the same process, hence both.
+        with self._lock:
+            lock = self._locks.setdefault(upload_id, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return None
+        if fcntl is None:
+            return lock.release
+        try:
+            f = open(self._path(upload_id, 'lock'), 'wb')
+        except OSError:
+            lock.release()
+            return None
+        try:
+            fcntl.lockf(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            lock.release()
+            return None
+
+        def release():
+            f.close()
+            lock.release()
+        return release
+
+    def _state(self, upload_id, offset):
+        # The running hash (and zip scan) for this upload, rebuilt from the
+        # data file when another process appended to it since.
+        state = self._states.get(upload_id)
+        if state is None or state.offset != offset:
+            hasher = hashlib.sha256()
+            with open(self._path(upload_id, 'data'), 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+            state = _UploadState(offset, hasher, ZipScanner(self.max_size, self.member_extensions))
+            self._states[upload_id] = state
+        return state
+
+    def append(self, upload_id, offset, stream, max_chunk_size):
+        # Appends stream to the upload if offset is where it currently ends.
+        # Returns (offset after the write, None) or (current offset, error):
+        # 'not_found', 'busy', 'offset_mismatch', 'too_large' or
+        # 'chunk_too_large'. Bytes received before a client disconnect are
+        # kept, so the next chunk starts at the returned offset.
+        upload = self.info(upload_id)
+        if upload is None:
+            return None, 'not_found'
+        release = self._acquire(upload_id)
+        if release is None:
+            return upload['offset'], 'busy'
+        try:
+            path = self._path(upload_id, 'data')
+            current = os.path.getsize(path)
+            if offset != current:
+                return current, 'offset_mismatch'
+            limit = self.max_size if upload['size'] is None else min(upload['size'], self.max_size)
+            state = self._state(upload_id, current)
+            error = None
+            written = 0
+            with open(path, 'ab') as f:
+                try:
+                    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+                        if written + len(chunk) > max_chunk_size:
+                            error = 'chunk_too_large'
+                        elif current + written + len(chunk) > limit:
+                            error = 'too_large'
+                        if error:
+                            break
+                        f.write(chunk)
+                        state.hasher.update(chunk)
+                        written += len(chunk)
+                finally:
+                    f.flush()
+                    state.offset = current + written
+            if error:
+                # a rejected chunk is dropped whole
+                with open(path, 'r+b') as f:
+                    f.truncate(current)
+                self._states.pop(upload_id, None)
+                return current, error
+            if self.member_handler is not None and upload['filename'].lower().endswith('.zip'):
+                with open(path, 'rb') as f:
+                    for name, data in state.scanner.scan(f, state.offset):
+                        if self.member_handler(upload_id, name, data) is False:
+                            state.scanner.done = True
+                            break
+            return state.offset, None
+        finally:
+            release()
+
+    def seal(self, upload_id):
+        # Fixes the upload's size at what has arrived, so no later chunk can
+        # change it, and returns (info with 'sha256', None) or (None, error):
+        # 'not_found', 'busy' or 'incomplete' when a declared size was not
+        # reached.
+        upload = self.info(upload_id)
+        if upload is None:
+            return None, 'not_found'
+        release = self._acquire(upload_id)
+        if release is None:
+            return None, 'busy'
+        try:
+            offset = os.path.getsize(self._path(upload_id, 'data'))
+            if upload['size'] is not None and offset != upload['size']:
+                return None, 'incomplete'
+            if upload['size'] is None:
+                meta = {key: upload[key] for key in ('filename', 'size', 'created_at')}
+                meta['size'] = offset
+                with open(self._path(upload_id, 'meta.json'), 'w') as f:
+                    json.dump(meta, f)
+            digest = self._state(upload_id, offset).hasher.hexdigest()
+            return dict(upload, size=offset, offset=offset, complete=True, sha256=digest), None
+        finally:
+            release()
+
+    def open(self, upload_id):
+        return open(self._path(upload_id, 'data'), 'rb')
+
+    def delete(self, upload_id):
+        path = self._path(upload_id)
+        if path is None:
+            return
+        shutil.rmtree(path, ignore_errors=True)
+        self._states.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+        if self.delete_handler is not None:
+            self.delete_handler(upload_id)
+
+    def prune(self):
+        # Drops uploads nobody has written to for retention_seconds
+        cutoff = time.time() - self.retention_seconds
+        for upload_id in os.listdir(self.directory):
+            path = self._path(upload_id, 'data')
+            if path is None:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    self.delete(upload_id)
+            except OSError:
+                pass